@@ -7,8 +7,9 @@ from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, current_user
-from flask_jwt_extended import JWTManager
 from sqlalchemy.orm import DeclarativeBase
+from utils.json_provider import ORJSONProvider
+from utils.jwt_cache import CachingJWTManager
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -22,25 +23,37 @@ db = SQLAlchemy(model_class=Base)
 
 # Create the Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev_secret_key")
 
 # Configure the database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
     "pool_pre_ping": True,
 }
+# Size the connection pool to match worker concurrency (SQLite uses a pool without these settings)
+if not (app.config["SQLALCHEMY_DATABASE_URI"] or "").startswith("sqlite"):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update({
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 20)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 30)),
+    })
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 # JWT configuration
 # Use a simple fixed key for development
 app.config["JWT_SECRET_KEY"] = "dev-key-123456"
+# Tokens are only issued and verified by this service, so a symmetric HMAC signature suffices
+app.config["JWT_ALGORITHM"] = "HS256"
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)  # 1 hour
 app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)  # 30 days
 app.config["JWT_TOKEN_LOCATION"] = ["headers"]
 app.config["JWT_HEADER_NAME"] = "Authorization"
 app.config["JWT_HEADER_TYPE"] = "Bearer"
 
+# Password hashing cost (bcrypt log rounds); each step doubles hashing time
+app.config["BCRYPT_LOG_ROUNDS"] = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+
 # Initialize the database with the app
 db.init_app(app)
 
@@ -49,7 +62,7 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 
 # Initialize Flask-JWT-Extended
-jwt = JWTManager(app)
+jwt = CachingJWTManager(app)
 from utils.auth import register_jwt_error_handlers
 register_jwt_error_handlers(jwt)
 
@@ -60,7 +73,7 @@ CORS(app, resources={r"/api/*": {"origins": "*"}})
 @login_manager.user_loader
 def load_user(user_id):
     from models import AdminModel
-    return AdminModel.query.get(int(user_id))
+    return db.session.get(AdminModel, int(user_id))
 
 # Import and register routes
 from routes.subscribers import subscribers_bp
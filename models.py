@@ -5,7 +5,8 @@ from datetime import datetime
 import uuid
 from flask_bcrypt import Bcrypt
 from typing import Dict, List, Any, Optional, Union
-from sqlalchemy import String, Integer, DateTime, Boolean, Float, ForeignKey, Text, Table, Column
+from urllib.parse import quote_plus
+from sqlalchemy import String, Integer, DateTime, Boolean, Float, ForeignKey, Text, Table, Column, Index
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from flask_login import UserMixin
@@ -13,6 +14,13 @@ from app import db, app
 
 bcrypt = Bcrypt(app)
 
+# Generated avatar for users without an uploaded profile image
+_AVATAR_URL = "https://ui-avatars.com/api/?name={}&background=random".format
+
+def default_avatar_url(username):
+    """Return the generated avatar URL for a username"""
+    return _AVATAR_URL(quote_plus(username))
+
 # Global variables to maintain backward compatibility during transition
 subscribers_data: List[Dict[str, Any]] = []
 users_data: List[Dict[str, Any]] = []
@@ -27,7 +35,7 @@ notifications_data: List[Dict[str, Any]] = []
 admin_roles = Table('admin_roles',
     db.Model.metadata,
     Column('admin_id', Integer, ForeignKey('admins.id'), primary_key=True),
-    Column('role_id', Integer, ForeignKey('roles.id'), primary_key=True)
+    Column('role_id', Integer, ForeignKey('roles.id'), primary_key=True, index=True)
 )
 
 # Define role permissions
@@ -55,8 +63,8 @@ class AdminModel(db.Model, UserMixin):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
     
-    # Relationship with roles
-    roles = relationship('RoleModel', secondary=admin_roles, backref='admins')
+    # Relationship with roles; to_dict() and permission checks always need them, so load them eagerly
+    roles = relationship('RoleModel', secondary=admin_roles, back_populates='admins', lazy='selectin')
     
     def set_password(self, password):
         """Hash the password for storage"""
@@ -100,6 +108,9 @@ class RoleModel(db.Model):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
     
+    # Admins holding this role
+    admins = relationship('AdminModel', secondary=admin_roles, back_populates='roles')
+    
     def has_permission(self, permission):
         """Check if role has specific permission"""
         return PermissionType.ALL in self.permissions or permission in self.permissions
@@ -144,6 +155,16 @@ class SubscriberModel(db.Model):
 
 class UserModel(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Status breakdowns and recent-registration counts in the stats endpoint
+        Index('ix_users_status_registration_date', 'status', 'registration_date'),
+    )
+    
+    # Fields that may be changed through the update endpoint; anything else is ignored
+    WRITABLE_FIELDS = frozenset({
+        'email', 'username', 'full_name', 'profile_image', 'bio', 'status',
+        'favorite_sports', 'favorite_teams', 'favorite_players'
+    })
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     uuid: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
@@ -152,7 +173,7 @@ class UserModel(db.Model):
     full_name: Mapped[str] = mapped_column(String(120), nullable=False)
     profile_image: Mapped[str] = mapped_column(String(255), nullable=True)
     bio: Mapped[str] = mapped_column(Text, nullable=True)
-    registration_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    registration_date: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     last_login: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     status: Mapped[str] = mapped_column(String(20), nullable=False)  # active, inactive, suspended
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
@@ -163,26 +184,38 @@ class UserModel(db.Model):
     favorite_teams: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=True, default=[])
     favorite_players: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=True, default=[])
     
-    # Subscription relationship - to be implemented if needed
-    # subscription = relationship("SubscriberModel", backref="user", uselist=False)
+    # Subscription matched by email; read-only since subscribers are managed separately
+    subscription = relationship(
+        "SubscriberModel",
+        primaryjoin="foreign(SubscriberModel.email) == UserModel.email",
+        uselist=False,
+        viewonly=True
+    )
     
     def to_dict(self):
+        return UserModel.serialize(self)
+    
+    @staticmethod
+    def serialize(user):
+        """Build the API representation from a UserModel or a row of its columns"""
         return {
-            "id": self.id,
-            "uuid": self.uuid,
-            "email": self.email,
-            "username": self.username,
-            "full_name": self.full_name,
-            "profile_image": self.profile_image,
-            "bio": self.bio,
-            "registration_date": self.registration_date.isoformat(),
-            "last_login": self.last_login.isoformat(),
-            "status": self.status,
-            "favorite_sports": self.favorite_sports or [],
-            "favorite_teams": self.favorite_teams or [],
-            "favorite_players": self.favorite_players or [],
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
+            "id": user.id,
+            "uuid": user.uuid,
+            "email": user.email,
+            "username": user.username,
+            "full_name": user.full_name,
+            # Users without an uploaded image get a generated avatar; only the
+            # override is stored, so the column stays NULL by default
+            "profile_image": user.profile_image or default_avatar_url(user.username),
+            "bio": user.bio,
+            "registration_date": user.registration_date.isoformat(),
+            "last_login": user.last_login.isoformat(),
+            "status": user.status,
+            "favorite_sports": user.favorite_sports or [],
+            "favorite_teams": user.favorite_teams or [],
+            "favorite_players": user.favorite_players or [],
+            "created_at": user.created_at.isoformat(),
+            "updated_at": user.updated_at.isoformat()
         }
 
 class LeagueModel(db.Model):
@@ -229,7 +262,7 @@ class TeamModel(db.Model):
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
-    league_id: Mapped[int] = mapped_column(Integer, ForeignKey('leagues.id'), nullable=False)
+    league_id: Mapped[int] = mapped_column(Integer, ForeignKey('leagues.id'), nullable=False, index=True)
     logo_url: Mapped[str] = mapped_column(String(255), nullable=False)
     popularity: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
@@ -254,8 +287,8 @@ class PlayerModel(db.Model):
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
-    team_id: Mapped[int] = mapped_column(Integer, ForeignKey('teams.id'), nullable=False)
-    league_id: Mapped[int] = mapped_column(Integer, ForeignKey('leagues.id'), nullable=False)
+    team_id: Mapped[int] = mapped_column(Integer, ForeignKey('teams.id'), nullable=False, index=True)
+    league_id: Mapped[int] = mapped_column(Integer, ForeignKey('leagues.id'), nullable=False, index=True)
     position: Mapped[str] = mapped_column(String(50), nullable=False)
     jersey_number: Mapped[str] = mapped_column(String(10), nullable=False)
     profile_image: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -297,7 +330,7 @@ class ReelModel(db.Model):
     __tablename__ = 'reels'
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    player_id: Mapped[int] = mapped_column(Integer, ForeignKey('players.id'), nullable=False)
+    player_id: Mapped[int] = mapped_column(Integer, ForeignKey('players.id'), nullable=False, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     thumbnail_url: Mapped[str] = mapped_column(String(255), nullable=False)
     video_url: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -325,7 +358,7 @@ class UserActivityModel(db.Model):
     __tablename__ = 'user_activity'
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    date: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     active_users: Mapped[int] = mapped_column(Integer, nullable=False)
     new_users: Mapped[int] = mapped_column(Integer, nullable=False)
     
@@ -363,7 +396,7 @@ class NotificationModel(db.Model):
     image_url: Mapped[str] = mapped_column(String(255), nullable=True)
     icon_url: Mapped[str] = mapped_column(String(255), nullable=True)
     target_type: Mapped[str] = mapped_column(String(20), default="all")  # "all" or "user"
-    target_user_id: Mapped[int] = mapped_column(Integer, nullable=True)  # Only used if target_type is "user"
+    target_user_id: Mapped[int] = mapped_column(Integer, nullable=True, index=True)  # Only used if target_type is "user"
     sent: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -388,6 +421,7 @@ class Subscriber:
     @staticmethod
     def create_record(id: int, email: str, name: str, subscription_type: str, 
                       start_date: datetime, end_date: datetime, status: str) -> Dict[str, Any]:
+        now = datetime.now()
         return {
             "id": id,
             "email": email,
@@ -396,8 +430,8 @@ class Subscriber:
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
             "status": status,  # active, expired, cancelled
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
         }
 
 class User:
@@ -409,13 +443,14 @@ class User:
                       bio: str = "", favorite_sports: List[str] = None,
                       favorite_teams: List[int] = None,
                       favorite_players: List[int] = None) -> Dict[str, Any]:
+        now = datetime.now()
         return {
             "id": id,
             "uuid": uuid or f"user-{id}-uuid",  # In a real system, this would be a proper UUID
             "email": email,
             "username": username,
             "full_name": full_name or username,  # Use full name if provided, otherwise username
-            "profile_image": profile_image or f"https://ui-avatars.com/api/?name={username}&background=random",
+            "profile_image": profile_image or default_avatar_url(username),
             "bio": bio or "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.",
             "registration_date": registration_date.isoformat(),
             "last_login": last_login.isoformat(),
@@ -423,8 +458,8 @@ class User:
             "favorite_sports": favorite_sports or [],
             "favorite_teams": favorite_teams or [],
             "favorite_players": favorite_players or [],
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
         }
 
 class League:
@@ -435,6 +470,7 @@ class League:
                       headquarters: str = "", commissioner: str = "",
                       divisions: List[str] = [], num_teams: int = 0, 
                       enabled: bool = True) -> Dict[str, Any]:
+        now = datetime.now()
         return {
             "id": id,
             "name": name,
@@ -448,22 +484,23 @@ class League:
             "divisions": divisions or [],
             "num_teams": num_teams,
             "enabled": enabled,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
         }
 
 class Team:
     @staticmethod
     def create_record(id: int, name: str, league_id: int, 
                       logo_url: str, popularity: int) -> Dict[str, Any]:
+        now = datetime.now()
         return {
             "id": id,
             "name": name,
             "league_id": league_id,
             "logo_url": logo_url,
             "popularity": popularity,  # view count or rating
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
         }
 
 class UserActivity:
@@ -492,6 +529,7 @@ class Player:
                       height_weight: str = "", bat_throw: str = "",
                       experience: str = "", birthplace: str = "", 
                       status: str = "Active") -> Dict[str, Any]:
+        now = datetime.now()
         return {
             "id": id,
             "name": name,
@@ -507,8 +545,8 @@ class Player:
             "experience": experience,
             "birthplace": birthplace,
             "status": status,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
         }
 
 class Reel:
@@ -606,26 +644,28 @@ class FAQ:
     @staticmethod
     def create_record(id: int, question: str, answer: str, order: int = 0, 
                      is_published: bool = True) -> Dict[str, Any]:
+        now = datetime.now()
         return {
             "id": id,
             "question": question,
             "answer": answer,
             "order": order,
             "is_published": is_published,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
         }
 
 class ContentPage:
     @staticmethod
     def create_record(id: int, page_type: str, title: str, content: str,
                      is_published: bool = True) -> Dict[str, Any]:
+        now = datetime.now()
         return {
             "id": id,
             "page_type": page_type,  # privacy_policy, terms_conditions
             "title": title,
             "content": content,
             "is_published": is_published,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
         }
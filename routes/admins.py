@@ -6,9 +6,12 @@ Handles creating, updating, and managing admin users.
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, AdminModel, RoleModel, PermissionType
-from utils.auth import require_permission
+from utils.auth import invalidate_admin_access, require_permission
+from utils.db_errors import duplicate_field
 from utils.response_formatter import format_response, format_error
-from sqlalchemy import desc
+from sqlalchemy import desc, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
 admins_bp = Blueprint('admins', __name__)
 
@@ -22,8 +25,8 @@ def get_admins():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        # Query admins with pagination
-        query = AdminModel.query.order_by(AdminModel.name)
+        # Query admins with pagination, loading every page's roles in one extra query
+        query = AdminModel.query.options(selectinload(AdminModel.roles)).order_by(AdminModel.name)
         pagination = query.paginate(page=page, per_page=per_page)
         
         # Format response
@@ -48,7 +51,7 @@ def get_admins():
 def get_admin(admin_id):
     """Get a specific admin by ID"""
     try:
-        admin = AdminModel.query.get(admin_id)
+        admin = db.session.get(AdminModel, admin_id)
         
         if not admin:
             return format_error(f"Admin with ID {admin_id} not found", status_code=404)
@@ -69,16 +72,7 @@ def create_admin():
         if not data or not data.get('username') or not data.get('email') or not data.get('name') or not data.get('password'):
             return format_error("Username, email, name, and password are required", status_code=400)
         
-        # Check if admin with same username or email already exists
-        existing_admin = AdminModel.query.filter_by(username=data['username']).first()
-        if existing_admin:
-            return format_error(f"Admin with username '{data['username']}' already exists", status_code=400)
-        
-        existing_admin = AdminModel.query.filter_by(email=data['email']).first()
-        if existing_admin:
-            return format_error(f"Admin with email '{data['email']}' already exists", status_code=400)
-        
-        # Create new admin
+        # Create new admin; duplicate usernames and emails are rejected by the unique constraints
         new_admin = AdminModel(
             username=data['username'],
             email=data['email'],
@@ -91,16 +85,20 @@ def create_admin():
         
         # Assign roles if provided
         if data.get('role_ids'):
-            for role_id in data['role_ids']:
-                role = RoleModel.query.get(role_id)
-                if role:
-                    new_admin.roles.append(role)
+            new_admin.roles.extend(RoleModel.query.filter(RoleModel.id.in_(data['role_ids'])).all())
         
         db.session.add(new_admin)
         db.session.commit()
         
         return format_response(new_admin.to_dict())
     
+    except IntegrityError as e:
+        db.session.rollback()
+        field = duplicate_field(e, ('username', 'email'))
+        if field:
+            return format_error(f"Admin with {field} '{data[field]}' already exists", status_code=400)
+        return format_error(f"Error creating admin: {str(e)}")
+    
     except Exception as e:
         db.session.rollback()
         return format_error(f"Error creating admin: {str(e)}")
@@ -111,7 +109,7 @@ def create_admin():
 def update_admin(admin_id):
     """Update an existing admin user"""
     try:
-        admin = AdminModel.query.get(admin_id)
+        admin = db.session.get(AdminModel, admin_id)
         
         if not admin:
             return format_error(f"Admin with ID {admin_id} not found", status_code=404)
@@ -129,15 +127,19 @@ def update_admin(admin_id):
         # Update admin fields
         if 'username' in data:
             # Check for duplicate username
-            existing_admin = AdminModel.query.filter_by(username=data['username']).first()
-            if existing_admin and existing_admin.id != admin_id:
+            username_taken = db.session.query(exists().where(
+                AdminModel.username == data['username'], AdminModel.id != admin_id
+            )).scalar()
+            if username_taken:
                 return format_error(f"Admin with username '{data['username']}' already exists", status_code=400)
             admin.username = data['username']
         
         if 'email' in data:
             # Check for duplicate email
-            existing_admin = AdminModel.query.filter_by(email=data['email']).first()
-            if existing_admin and existing_admin.id != admin_id:
+            email_taken = db.session.query(exists().where(
+                AdminModel.email == data['email'], AdminModel.id != admin_id
+            )).scalar()
+            if email_taken:
                 return format_error(f"Admin with email '{data['email']}' already exists", status_code=400)
             admin.email = data['email']
         
@@ -153,16 +155,11 @@ def update_admin(admin_id):
         
         # Update roles if provided
         if 'role_ids' in data:
-            # Clear existing roles
-            admin.roles = []
-            
-            # Add new roles
-            for role_id in data['role_ids']:
-                role = RoleModel.query.get(role_id)
-                if role:
-                    admin.roles.append(role)
+            # Replace existing roles with the requested ones in a single lookup
+            admin.roles = RoleModel.query.filter(RoleModel.id.in_(data['role_ids'])).all() if data['role_ids'] else []
         
         db.session.commit()
+        invalidate_admin_access(admin_id)
         
         return format_response(admin.to_dict())
     
@@ -176,7 +173,7 @@ def update_admin(admin_id):
 def delete_admin(admin_id):
     """Delete an admin user"""
     try:
-        admin = AdminModel.query.get(admin_id)
+        admin = db.session.get(AdminModel, admin_id)
         
         if not admin:
             return format_error(f"Admin with ID {admin_id} not found", status_code=404)
@@ -188,6 +185,7 @@ def delete_admin(admin_id):
         
         db.session.delete(admin)
         db.session.commit()
+        invalidate_admin_access(admin_id)
         
         return format_response({"message": f"Admin '{admin.name}' deleted successfully"})
     
@@ -201,7 +199,7 @@ def delete_admin(admin_id):
 def toggle_admin_status(admin_id):
     """Toggle admin active status"""
     try:
-        admin = AdminModel.query.get(admin_id)
+        admin = db.session.get(AdminModel, admin_id)
         
         if not admin:
             return format_error(f"Admin with ID {admin_id} not found", status_code=404)
@@ -214,6 +212,7 @@ def toggle_admin_status(admin_id):
         # Toggle status
         admin.is_active = not admin.is_active
         db.session.commit()
+        invalidate_admin_access(admin_id)
         
         status = "activated" if admin.is_active else "deactivated"
         return format_response({
@@ -3,13 +3,16 @@ Authentication routes for the Gambit Admin API.
 Handles login, logout, and password management.
 """
 
+import hashlib
 import logging
 import traceback
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import get_jwt_identity, jwt_required
-from datetime import datetime
+from flask_jwt_extended import decode_token, get_jwt_identity, jwt_required
+from datetime import datetime, timedelta
+from sqlalchemy import select
 from models import AdminModel, db
 from utils.auth import create_auth_token
+from utils.cache import TTLCache
 from utils.response_formatter import format_response, format_error
 
 # Configure logging
@@ -17,6 +20,28 @@ logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint('auth', __name__)
 
+# Logins within this window of the recorded last_login skip the write
+LAST_LOGIN_RESOLUTION = timedelta(minutes=5)
+
+# Short-lived cache of password verification results so repeated logins
+# within the TTL skip the bcrypt work. Memory only, never persisted.
+_password_cache = TTLCache(maxsize=2048, ttl=30)
+
+def _cached_check_password(admin, password):
+    """Verify a password against the admin's hash, reusing recent results"""
+    key = hashlib.sha256(f"{admin.id}:{admin.password_hash}:{password}".encode()).digest()
+    result = _password_cache.get(key)
+    if result is None:
+        result = admin.check_password(password)
+        _password_cache[key] = result
+    return result
+
+def _profile_etag(admin):
+    """Build a validator that changes whenever the admin's to_dict() output can change"""
+    parts = [str(admin.id), admin.updated_at.isoformat()]
+    parts.extend(f"{role.id}:{role.updated_at.isoformat()}" for role in admin.roles)
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
 @auth_bp.route('/test', methods=['GET'])
 def test():
     """Test route to verify API is running"""
@@ -31,7 +56,6 @@ def test_jwt():
     if auth_header.startswith('Bearer '):
         token = auth_header.split(' ')[1]
         try:
-            from flask_jwt_extended import decode_token
             decoded = decode_token(token)
             return format_response({
                 "message": "JWT verification successful",
@@ -39,7 +63,6 @@ def test_jwt():
                 "auth_header": auth_header
             })
         except Exception as e:
-            import traceback
             return format_response({
                 "message": "JWT verification failed",
                 "error": str(e),
@@ -62,19 +85,23 @@ def login():
             return format_error("Missing username or password", status_code=400)
         
         # Find admin by username
-        admin = AdminModel.query.filter_by(username=data['username']).first()
+        admin = db.session.execute(
+            select(AdminModel).where(AdminModel.username == data['username'])
+        ).scalar_one_or_none()
         
         # Check if admin exists and password is correct
-        if not admin or not admin.check_password(data['password']):
+        if not admin or not _cached_check_password(admin, data['password']):
             return format_error("Invalid username or password", status_code=401)
         
         # Check if account is active
         if not admin.is_active:
             return format_error("Your account has been deactivated", status_code=403)
         
-        # Update last login time
-        admin.last_login = datetime.now()
-        db.session.commit()
+        # Update last login time, at most once per LAST_LOGIN_RESOLUTION
+        now = datetime.now()
+        if not admin.last_login or now - admin.last_login > LAST_LOGIN_RESOLUTION:
+            admin.last_login = now
+            db.session.commit()
         
         # Generate token
         token = create_auth_token(admin.id)
@@ -91,8 +118,7 @@ def login():
         return response
     
     except Exception as e:
-        logger.error(f"Login error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Login error: %s", e)
         return format_error(f"Login error: {str(e)}")
 
 @auth_bp.route('/me', methods=['GET'])
@@ -105,12 +131,19 @@ def get_current_user():
         if isinstance(admin_id, str):
             admin_id = int(admin_id)
         
-        admin = AdminModel.query.get(admin_id)
+        admin = db.session.get(AdminModel, admin_id)
         
         if not admin:
             return format_error("Invalid authentication credentials", status_code=401)
         
-        return format_response(admin.to_dict())
+        # Let clients revalidate cached profiles without re-sending the body
+        etag = _profile_etag(admin)
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = format_response(admin.to_dict())
+        response.set_etag(etag, weak=True)
+        return response
     
     except Exception as e:
         return format_error(f"Error retrieving user profile: {str(e)}")
@@ -120,29 +153,31 @@ def get_current_user():
 def change_password():
     """Change password for current admin user"""
     try:
+        # Reject incomplete requests before touching the database
+        data = request.get_json()
+        
+        if not data or not data.get('current_password') or not data.get('new_password'):
+            return format_error("Missing current password or new password", status_code=400)
+        
         admin_id = get_jwt_identity()
         # Convert admin_id back to integer if it's a string
         if isinstance(admin_id, str):
             admin_id = int(admin_id)
             
-        admin = AdminModel.query.get(admin_id)
+        admin = db.session.get(AdminModel, admin_id)
         
         if not admin:
             return format_error("Invalid authentication credentials", status_code=401)
         
-        data = request.get_json()
-        
-        if not data or not data.get('current_password') or not data.get('new_password'):
-            return format_error("Missing current password or new password", status_code=400)
-        
         # Verify current password
-        if not admin.check_password(data['current_password']):
+        if not _cached_check_password(admin, data['current_password']):
             return format_error("Current password is incorrect", status_code=400)
         
         # Set new password
         admin.set_password(data['new_password'])
         admin.updated_at = datetime.now()
         db.session.commit()
+        _password_cache.clear()
         
         return format_response({"message": "Password changed successfully"})
     
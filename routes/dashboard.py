@@ -1,5 +1,7 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, render_template
 import logging
+from collections import Counter
+from datetime import datetime, timedelta
 from models import subscribers_data, users_data, leagues_data, teams_data, user_activity_data
 from utils.response_formatter import format_response, format_error
 
@@ -9,14 +11,19 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 dashboard_bp = Blueprint('dashboard', __name__)
 
+def _count_active_subscriptions():
+    """Count active subscribers by subscription type in a single pass"""
+    return Counter(s['subscription_type'] for s in subscribers_data if s['status'] == 'active')
+
 @dashboard_bp.route('/', methods=['GET'])
 def get_dashboard_data():
     """Get all dashboard data in a single request"""
     try:
         # Get subscriber counts
         total_subscribers = len(subscribers_data)
-        monthly_subscribers = len([s for s in subscribers_data if s['subscription_type'] == 'monthly' and s['status'] == 'active'])
-        yearly_subscribers = len([s for s in subscribers_data if s['subscription_type'] == 'yearly' and s['status'] == 'active'])
+        active_by_type = _count_active_subscriptions()
+        monthly_subscribers = active_by_type['monthly']
+        yearly_subscribers = active_by_type['yearly']
         
         # Get most popular league
         most_viewed_league = max(leagues_data, key=lambda x: x['popularity']) if leagues_data else None
@@ -50,8 +57,9 @@ def get_subscriber_overview():
     try:
         # Get subscriber counts
         total_subscribers = len(subscribers_data)
-        monthly_subscribers = len([s for s in subscribers_data if s['subscription_type'] == 'monthly' and s['status'] == 'active'])
-        yearly_subscribers = len([s for s in subscribers_data if s['subscription_type'] == 'yearly' and s['status'] == 'active'])
+        active_by_type = _count_active_subscriptions()
+        monthly_subscribers = active_by_type['monthly']
+        yearly_subscribers = active_by_type['yearly']
         
         # Get subscription growth rate
         growth_rate = 0.8  # This would be calculated from historical data
@@ -72,13 +80,13 @@ def get_subscriber_overview():
 def get_user_overview():
     """Get user statistics overview"""
     try:
-        # Get active users count
-        active_users = len([u for u in users_data if u['status'] == 'active'])
-        
-        # Get new users count (registered in the last 30 days)
-        from datetime import datetime, timedelta
+        # Count active users and new users (registered in the last 30 days) in one pass
         thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-        new_users = len([u for u in users_data if u['registration_date'] > thirty_days_ago])
+        active_users = 0
+        new_users = 0
+        for u in users_data:
+            active_users += u['status'] == 'active'
+            new_users += u['registration_date'] > thirty_days_ago
         
         user_overview = {
             "total_users": len(users_data),
@@ -118,7 +126,6 @@ def manage_leagues():
     """Serve the Manage Leagues page"""
     try:
         # Fetch leagues data (this can be extended to fetch from the database or API)
-        from flask import render_template
         return render_template('manage_leagues.html')
     except Exception as e:
         logger.error(f"Error loading Manage Leagues page: {str(e)}")
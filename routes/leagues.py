@@ -51,7 +51,7 @@ def get_leagues():
 def get_league(league_id):
     """Get a specific league by ID"""
     try:
-        league = LeagueModel.query.get(league_id)
+        league = db.session.get(LeagueModel, league_id)
         if league:
             return format_response(league.to_dict())
         return format_error("League not found"), 404
@@ -119,7 +119,7 @@ def update_league(league_id):
             return format_error("Invalid request data"), 400
             
         # Find league
-        league = LeagueModel.query.get(league_id)
+        league = db.session.get(LeagueModel, league_id)
         if league is None:
             return format_error("League not found"), 404
             
@@ -151,7 +151,7 @@ def toggle_league_status(league_id):
     """Toggle league enabled/disabled status"""
     try:
         # Find league
-        league = LeagueModel.query.get(league_id)
+        league = db.session.get(LeagueModel, league_id)
         if league is None:
             return format_error("League not found"), 404
             
@@ -177,7 +177,7 @@ def delete_league(league_id):
     """Delete a league"""
     try:
         # Find league
-        league = LeagueModel.query.get(league_id)
+        league = db.session.get(LeagueModel, league_id)
         if league is None:
             return format_error("League not found"), 404
             
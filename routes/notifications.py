@@ -48,7 +48,7 @@ def get_notifications():
 @require_permission(PermissionType.NOTIFICATION)
 def get_notification(notification_id):
     """Get a specific notification by ID"""
-    notification = NotificationModel.query.get(notification_id)
+    notification = db.session.get(NotificationModel, notification_id)
     
     if not notification:
         return format_error(f"Notification with ID {notification_id} not found", status_code=404)
@@ -103,7 +103,7 @@ def create_notification():
 @require_permission(PermissionType.NOTIFICATION)
 def update_notification(notification_id):
     """Update an existing notification"""
-    notification = NotificationModel.query.get(notification_id)
+    notification = db.session.get(NotificationModel, notification_id)
     
     if not notification:
         return format_error(f"Notification with ID {notification_id} not found", status_code=404)
@@ -144,7 +144,7 @@ def update_notification(notification_id):
 @require_permission(PermissionType.NOTIFICATION)
 def delete_notification(notification_id):
     """Delete a notification"""
-    notification = NotificationModel.query.get(notification_id)
+    notification = db.session.get(NotificationModel, notification_id)
     
     if not notification:
         return format_error(f"Notification with ID {notification_id} not found", status_code=404)
@@ -167,7 +167,7 @@ def delete_notification(notification_id):
 @require_permission(PermissionType.NOTIFICATION)
 def send_notification(notification_id):
     """Send a notification (mark it as sent)"""
-    notification = NotificationModel.query.get(notification_id)
+    notification = db.session.get(NotificationModel, notification_id)
     
     if not notification:
         return format_error(f"Notification with ID {notification_id} not found", status_code=404)
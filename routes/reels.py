@@ -54,20 +54,20 @@ def get_reel(reel_id):
     """Get a specific reel by ID"""
     try:
         # Get reel by ID
-        reel = ReelModel.query.get(reel_id)
+        reel = db.session.get(ReelModel, reel_id)
         
         if not reel:
             return format_error(f"Reel with ID {reel_id} not found", status_code=404)
         
         # Get associated player with eager loading of team and league
-        player = PlayerModel.query.get(reel.player_id)
+        player = db.session.get(PlayerModel, reel.player_id)
         
         if not player:
             return format_error(f"Player with ID {reel.player_id} not found", status_code=404)
         
         # Get team and league
-        team = TeamModel.query.get(player.team_id)
-        league = LeagueModel.query.get(player.league_id)
+        team = db.session.get(TeamModel, player.team_id)
+        league = db.session.get(LeagueModel, player.league_id)
         
         # Prepare enriched reel data
         enriched_reel = {
@@ -118,8 +118,8 @@ def get_reels_with_player_details():
         
         for player in players:
             # Get team and league
-            team = TeamModel.query.get(player.team_id)
-            league = LeagueModel.query.get(player.league_id)
+            team = db.session.get(TeamModel, player.team_id)
+            league = db.session.get(LeagueModel, player.league_id)
             
             if team and league:
                 # Get reels for this player
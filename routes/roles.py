@@ -6,9 +6,10 @@ Handles creating, updating, and assigning roles.
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from models import db, AdminModel, RoleModel, PermissionType
-from utils.auth import require_permission
+from utils.auth import invalidate_admin_access, require_permission
 from utils.response_formatter import format_response, format_error
-from sqlalchemy import desc
+from sqlalchemy import desc, exists
+from sqlalchemy.orm import selectinload
 
 roles_bp = Blueprint('roles', __name__)
 
@@ -48,7 +49,7 @@ def get_roles():
 def get_role(role_id):
     """Get a specific role by ID"""
     try:
-        role = RoleModel.query.get(role_id)
+        role = db.session.get(RoleModel, role_id)
         
         if not role:
             return format_error(f"Role with ID {role_id} not found", status_code=404)
@@ -70,8 +71,8 @@ def create_role():
             return format_error("Role name is required", status_code=400)
         
         # Check if role with same name already exists
-        existing_role = RoleModel.query.filter_by(name=data['name']).first()
-        if existing_role:
+        name_taken = db.session.query(exists().where(RoleModel.name == data['name'])).scalar()
+        if name_taken:
             return format_error(f"Role with name '{data['name']}' already exists", status_code=400)
         
         # Create new role
@@ -96,7 +97,7 @@ def create_role():
 def update_role(role_id):
     """Update an existing role"""
     try:
-        role = RoleModel.query.get(role_id)
+        role = db.session.get(RoleModel, role_id)
         
         if not role:
             return format_error(f"Role with ID {role_id} not found", status_code=404)
@@ -109,8 +110,10 @@ def update_role(role_id):
         # Update role fields
         if 'name' in data:
             # Check for duplicate name
-            existing_role = RoleModel.query.filter_by(name=data['name']).first()
-            if existing_role and existing_role.id != role_id:
+            name_taken = db.session.query(exists().where(
+                RoleModel.name == data['name'], RoleModel.id != role_id
+            )).scalar()
+            if name_taken:
                 return format_error(f"Role with name '{data['name']}' already exists", status_code=400)
             role.name = data['name']
         
@@ -121,6 +124,8 @@ def update_role(role_id):
             role.permissions = data['permissions']
         
         db.session.commit()
+        # Permission changes apply to every admin holding the role
+        invalidate_admin_access()
         
         return format_response(role.to_dict())
     
@@ -134,7 +139,7 @@ def update_role(role_id):
 def delete_role(role_id):
     """Delete a role"""
     try:
-        role = RoleModel.query.get(role_id)
+        role = db.session.get(RoleModel, role_id)
         
         if not role:
             return format_error(f"Role with ID {role_id} not found", status_code=404)
@@ -184,8 +189,8 @@ def get_admin_role_assignments():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        # Query admins with pagination
-        query = AdminModel.query.order_by(AdminModel.name)
+        # Query admins with pagination, loading every page's roles in one extra query
+        query = AdminModel.query.options(selectinload(AdminModel.roles)).order_by(AdminModel.name)
         pagination = query.paginate(page=page, per_page=per_page)
         
         # Format response with admin and their roles
@@ -221,11 +226,11 @@ def assign_role():
         if not data or not data.get('admin_id') or not data.get('role_id'):
             return format_error("Admin ID and role ID are required", status_code=400)
         
-        admin = AdminModel.query.get(data['admin_id'])
+        admin = db.session.get(AdminModel, data['admin_id'])
         if not admin:
             return format_error(f"Admin with ID {data['admin_id']} not found", status_code=404)
         
-        role = RoleModel.query.get(data['role_id'])
+        role = db.session.get(RoleModel, data['role_id'])
         if not role:
             return format_error(f"Role with ID {data['role_id']} not found", status_code=404)
         
@@ -236,6 +241,7 @@ def assign_role():
         # Assign role to admin
         admin.roles.append(role)
         db.session.commit()
+        invalidate_admin_access(admin.id)
         
         return format_response({
             "message": f"Role '{role.name}' assigned to admin '{admin.name}' successfully",
@@ -257,11 +263,11 @@ def unassign_role():
         if not data or not data.get('admin_id') or not data.get('role_id'):
             return format_error("Admin ID and role ID are required", status_code=400)
         
-        admin = AdminModel.query.get(data['admin_id'])
+        admin = db.session.get(AdminModel, data['admin_id'])
         if not admin:
             return format_error(f"Admin with ID {data['admin_id']} not found", status_code=404)
         
-        role = RoleModel.query.get(data['role_id'])
+        role = db.session.get(RoleModel, data['role_id'])
         if not role:
             return format_error(f"Role with ID {data['role_id']} not found", status_code=404)
         
@@ -272,6 +278,7 @@ def unassign_role():
         # Remove role from admin
         admin.roles.remove(role)
         db.session.commit()
+        invalidate_admin_access(admin.id)
         
         return format_response({
             "message": f"Role '{role.name}' removed from admin '{admin.name}' successfully",
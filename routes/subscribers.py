@@ -1,9 +1,10 @@
 from datetime import datetime
 from flask import Blueprint, request, jsonify
 import logging
-from models import subscribers_data, PermissionType
+from models import subscribers_data, Subscriber, PermissionType
 from utils.response_formatter import format_response, format_error
 from utils.auth import require_permission
+from utils.records import IdIndex, IdSequence
 from flask_jwt_extended import jwt_required
 from math import ceil
 
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 subscribers_bp = Blueprint('subscribers', __name__)
 
+_subscriber_ids = IdSequence(subscribers_data)
+_subscriber_index = IdIndex(subscribers_data)
+
 @subscribers_bp.route('/', methods=['GET'])
 @jwt_required()
 @require_permission(PermissionType.SUBSCRIBERS)
@@ -67,7 +71,7 @@ def get_subscribers():
 def get_subscriber(subscriber_id):
     """Get a specific subscriber by ID"""
     try:
-        subscriber = next((s for s in subscribers_data if s['id'] == subscriber_id), None)
+        subscriber = _subscriber_index.get(subscriber_id)
         if subscriber:
             return format_response(subscriber)
         return format_error("Subscriber not found"), 404
@@ -92,12 +96,9 @@ def create_subscriber():
                 return format_error(f"Missing required field: {field}"), 400
                 
         # Generate new ID
-        new_id = max([s['id'] for s in subscribers_data], default=0) + 1
+        new_id = _subscriber_ids.next_id()
         
         # Create new subscriber
-        from models import Subscriber
-        from datetime import datetime
-        
         new_subscriber = Subscriber.create_record(
             id=new_id,
             email=data['email'],
@@ -125,7 +126,7 @@ def update_subscriber(subscriber_id):
             return format_error("Invalid request data"), 400
             
         # Find subscriber
-        subscriber_index = next((i for i, s in enumerate(subscribers_data) if s['id'] == subscriber_id), None)
+        subscriber_index = _subscriber_index.index_of(subscriber_id)
         if subscriber_index is None:
             return format_error("Subscriber not found"), 404
             
@@ -150,7 +151,7 @@ def delete_subscriber(subscriber_id):
     """Delete a subscriber"""
     try:
         # Find subscriber
-        subscriber_index = next((i for i, s in enumerate(subscribers_data) if s['id'] == subscriber_id), None)
+        subscriber_index = _subscriber_index.index_of(subscriber_id)
         if subscriber_index is None:
             return format_error("Subscriber not found"), 404
             
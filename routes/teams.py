@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 import logging
-from models import teams_data, PermissionType
+from models import teams_data, Team, PermissionType
 from datetime import datetime
 from utils.response_formatter import format_response, format_error
 from utils.auth import require_permission
+from utils.records import IdIndex, IdSequence
 from flask_jwt_extended import jwt_required
 
 # Configure logger
@@ -12,6 +13,9 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 teams_bp = Blueprint('teams', __name__)
 
+_team_ids = IdSequence(teams_data)
+_team_index = IdIndex(teams_data)
+
 @teams_bp.route('/', methods=['GET'])
 @jwt_required()
 @require_permission(PermissionType.LEAGUES)
@@ -37,7 +41,7 @@ def get_teams():
 def get_team(team_id):
     """Get a specific team by ID"""
     try:
-        team = next((t for t in teams_data if t['id'] == team_id), None)
+        team = _team_index.get(team_id)
         if team:
             return format_response(team)
         return format_error("Team not found"), 404
@@ -62,11 +66,9 @@ def create_team():
                 return format_error(f"Missing required field: {field}"), 400
                 
         # Generate new ID
-        new_id = max([t['id'] for t in teams_data], default=0) + 1
+        new_id = _team_ids.next_id()
         
         # Create new team
-        from models import Team
-        
         new_team = Team.create_record(
             id=new_id,
             name=data['name'],
@@ -92,7 +94,7 @@ def update_team(team_id):
             return format_error("Invalid request data"), 400
             
         # Find team
-        team_index = next((i for i, t in enumerate(teams_data) if t['id'] == team_id), None)
+        team_index = _team_index.index_of(team_id)
         if team_index is None:
             return format_error("Team not found"), 404
             
@@ -117,7 +119,7 @@ def delete_team(team_id):
     """Delete a team"""
     try:
         # Find team
-        team_index = next((i for i, t in enumerate(teams_data) if t['id'] == team_id), None)
+        team_index = _team_index.index_of(team_id)
         if team_index is None:
             return format_error("Team not found"), 404
             
@@ -1,12 +1,17 @@
 from flask import Blueprint, request, jsonify
 import logging
-from datetime import datetime
+import uuid
+from datetime import datetime, timedelta
 from app import db
-from sqlalchemy import desc
+from sqlalchemy import delete, desc, func, lambda_stmt, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from flask_jwt_extended import jwt_required
-from models import UserModel, UserActivityModel, TeamModel, LeagueModel, PlayerModel, SubscriberModel
+from models import UserModel, UserActivityModel, TeamModel, LeagueModel, PlayerModel
+from utils.db_errors import duplicate_field
 from utils.response_formatter import format_response, format_error
 from utils.auth import require_permission
+from utils.cache import TTLCache
 from models import PermissionType
 
 # Configure logger
@@ -15,26 +20,63 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 users_bp = Blueprint('users', __name__)
 
+# Page size bounds for the user list
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Fields that create_user requires, in the order they are reported
+REQUIRED_USER_FIELDS = ('email', 'username', 'status', 'full_name')
+
+# Map of sport names to their logo URLs
+SPORT_LOGOS = {
+    "NFL": "https://upload.wikimedia.org/wikipedia/en/thumb/a/a2/National_Football_League_logo.svg/800px-National_Football_League_logo.svg.png",
+    "NBA": "https://upload.wikimedia.org/wikipedia/en/thumb/0/03/National_Basketball_Association_logo.svg/800px-National_Basketball_Association_logo.svg.png",
+    "MLB": "https://upload.wikimedia.org/wikipedia/en/thumb/a/a6/Major_League_Baseball_logo.svg/800px-Major_League_Baseball_logo.svg.png",
+    "NCAA-Football": "https://upload.wikimedia.org/wikipedia/commons/thumb/d/dd/NCAA_logo.svg/800px-NCAA_logo.svg.png"
+}
+DEFAULT_SPORT_LOGO = "https://placehold.co/400x400?text=Sport"
+
+# Dashboard stats tolerate brief staleness; keyed by the recent-registrations cutoff
+# and cleared whenever a user is created, updated, deleted or restricted
+_stats_cache = TTLCache(maxsize=4, ttl=30)
+
+def _get_user_by_uuid(user_uuid):
+    """Look up a user by UUID"""
+    # lambda_stmt caches the constructed statement; user_uuid is bound per call
+    return db.session.execute(
+        lambda_stmt(lambda: select(UserModel).where(UserModel.uuid == user_uuid))
+    ).scalar_one_or_none()
+
 @users_bp.route('/', methods=['GET'])
 @jwt_required()
 @require_permission(PermissionType.USERS)
 def get_users():
-    """Get all users with optional filtering"""
+    """Get users with optional filtering, one keyset-paginated page at a time"""
     try:
-        # Query parameters for filtering
+        # Query parameters for filtering and pagination
         status = request.args.get('status')
+        limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        after_id = request.args.get('after_id', type=int)
         
-        # Base query
-        query = UserModel.query
+        # Base query selects plain columns, skipping ORM instance construction
+        query = select(*UserModel.__table__.columns).order_by(UserModel.id)
         
         # Apply filters if provided
         if status:
-            query = query.filter(UserModel.status == status)
+            query = query.where(UserModel.status == status)
+        
+        # Seek past the previous page by id instead of scanning an OFFSET
+        if after_id is not None:
+            query = query.where(UserModel.id > after_id)
             
-        # Execute query and convert to list of dictionaries
-        users = [user.to_dict() for user in query.all()]
+        # Fetch one extra row to learn whether another page exists
+        rows = db.session.execute(query.limit(limit + 1)).all()
+        users = [UserModel.serialize(row) for row in rows[:limit]]
             
-        return format_response(users)
+        return format_response({
+            'users': users,
+            'next_cursor': users[-1]['id'] if len(rows) > limit else None
+        })
     except Exception as e:
         logger.error(f"Error getting users: {str(e)}")
         return format_error(str(e), status_code=500)
@@ -45,7 +87,7 @@ def get_users():
 def get_user(user_id):
     """Get a specific user by ID"""
     try:
-        user = UserModel.query.get(user_id)
+        user = db.session.get(UserModel, user_id)
         if user:
             return format_response(user.to_dict())
         return format_error("User not found", status_code=404)
@@ -59,7 +101,7 @@ def get_user(user_id):
 def get_user_by_uuid(user_uuid):
     """Get a specific user by UUID"""
     try:
-        user = UserModel.query.filter_by(uuid=user_uuid).first()
+        user = _get_user_by_uuid(user_uuid)
         if user:
             return format_response(user.to_dict())
         return format_error("User not found", status_code=404)
@@ -78,33 +120,41 @@ def create_user():
             return format_error("Invalid request data", status_code=400)
             
         # Validate required fields
-        required_fields = ['email', 'username', 'status', 'full_name']
-        for field in required_fields:
-            if field not in data:
-                return format_error(f"Missing required field: {field}", status_code=400)
+        missing = [field for field in REQUIRED_USER_FIELDS if field not in data]
+        if missing:
+            return format_error(f"Missing required field: {', '.join(missing)}", status_code=400)
         
         # Create a UUID if one wasn't provided
         if 'uuid' not in data or not data['uuid']:
-            import uuid
             data['uuid'] = f"user-{str(uuid.uuid4())}"
         
         # Create new user object
+        now = datetime.now()
         new_user = UserModel(
             email=data['email'],
             username=data['username'],
             uuid=data['uuid'],
             full_name=data['full_name'],
-            profile_image=data.get('profile_image', f"https://ui-avatars.com/api/?name={data['username']}&background=random"),
-            registration_date=datetime.now(),
-            last_login=datetime.now(),
+            profile_image=data.get('profile_image'),
+            registration_date=now,
+            last_login=now,
             status=data['status']
         )
         
         # Add to database
         db.session.add(new_user)
         db.session.commit()
+        _stats_cache.clear()
         
         return format_response(new_user.to_dict(), status_code=201)
+    except IntegrityError as e:
+        # Duplicate emails, usernames and UUIDs are rejected by the unique constraints
+        db.session.rollback()
+        field = duplicate_field(e, ('email', 'username', 'uuid'))
+        if field:
+            return format_error(f"User with {field} '{data[field]}' already exists", status_code=400)
+        logger.error(f"Error creating user: {str(e)}")
+        return format_error(str(e), status_code=500)
     except Exception as e:
         logger.error(f"Error creating user: {str(e)}")
         db.session.rollback()
@@ -121,17 +171,18 @@ def update_user(user_id):
             return format_error("Invalid request data", status_code=400)
             
         # Find user
-        user = UserModel.query.get(user_id)
+        user = db.session.get(UserModel, user_id)
         if not user:
             return format_error("User not found", status_code=404)
             
         # Update fields
         for key, value in data.items():
-            if hasattr(user, key) and key not in ['id', 'created_at', 'updated_at']:
+            if key in UserModel.WRITABLE_FIELDS:
                 setattr(user, key, value)
                 
         # Save to database
         db.session.commit()
+        _stats_cache.clear()
         
         return format_response(user.to_dict())
     except Exception as e:
@@ -143,21 +194,26 @@ def update_user(user_id):
 @jwt_required()
 @require_permission(PermissionType.USERS)
 def delete_user(user_id):
-    """Delete a user"""
+    """Delete a user; pass ?full=1 to get the deleted user back in the response"""
     try:
-        # Find user
-        user = UserModel.query.get(user_id)
+        # Delete in one statement, returning the full row only when asked for
+        full = request.args.get('full', type=int) == 1
+        columns = UserModel.__table__.columns if full else (UserModel.id,)
+        user = db.session.execute(
+            delete(UserModel)
+            .where(UserModel.id == user_id)
+            .returning(*columns)
+        ).first()
         if not user:
             return format_error("User not found", status_code=404)
         
-        # Save user data before deletion for response
-        user_dict = user.to_dict()
-            
-        # Remove from database
-        db.session.delete(user)
         db.session.commit()
+        _stats_cache.clear()
         
-        return format_response({"message": "User deleted successfully", "user": user_dict})
+        response = {"message": "User deleted successfully", "id": user_id}
+        if full:
+            response["user"] = UserModel.serialize(user)
+        return format_response(response)
     except Exception as e:
         logger.error(f"Error deleting user {user_id}: {str(e)}")
         db.session.rollback()
@@ -169,16 +225,23 @@ def delete_user(user_id):
 def get_user_stats():
     """Get user statistics"""
     try:
-        # Calculate user statistics
-        total_users = UserModel.query.count()
-        active_users = UserModel.query.filter_by(status='active').count()
-        inactive_users = UserModel.query.filter_by(status='inactive').count()
-        suspended_users = UserModel.query.filter_by(status='suspended').count()
+        # Recent registrations are users registered in the last 30 days
+        thirty_days_ago = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+        
+        stats = _stats_cache.get(thirty_days_ago)
+        if stats is not None:
+            return format_response(stats)
         
-        # Calculate recent registrations - users registered in the last 30 days
-        import datetime as dt
-        thirty_days_ago = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - dt.timedelta(days=30)
-        recent_users = UserModel.query.filter(UserModel.registration_date >= thirty_days_ago).count()
+        # Calculate all user statistics in a single pass over the table
+        total_users, active_users, inactive_users, suspended_users, recent_users = db.session.execute(
+            select(
+                func.count(),
+                func.count().filter(UserModel.status == 'active'),
+                func.count().filter(UserModel.status == 'inactive'),
+                func.count().filter(UserModel.status == 'suspended'),
+                func.count().filter(UserModel.registration_date >= thirty_days_ago)
+            ).select_from(UserModel)
+        ).one()
         
         # Format response
         stats = {
@@ -188,6 +251,7 @@ def get_user_stats():
             "suspended_users": suspended_users,
             "recent_registrations": recent_users
         }
+        _stats_cache[thirty_days_ago] = stats
         return format_response(stats)
     except Exception as e:
         logger.error(f"Error getting user stats: {str(e)}")
@@ -232,16 +296,20 @@ def get_user_activity():
 def get_user_profile(user_uuid):
     """Get a detailed user profile by UUID with favorites data"""
     try:
-        # Find user by UUID
-        user = UserModel.query.filter_by(uuid=user_uuid).first()
+        # Find user by UUID together with their subscription, if any
+        user = db.session.execute(
+            select(UserModel)
+            .options(joinedload(UserModel.subscription))
+            .where(UserModel.uuid == user_uuid)
+        ).scalar_one_or_none()
         if not user:
             return format_error("User not found", status_code=404)
+        subscription = user.subscription
         
         # Get basic user data
         user_data = user.to_dict()
         
         # Get subscription details if they exist
-        subscription = SubscriberModel.query.filter_by(email=user.email).first()
         subscription_data = None
         if subscription:
             subscription_data = {
@@ -258,27 +326,41 @@ def get_user_profile(user_uuid):
                 "logo_url": get_sport_logo_url(sport)
             })
         
-        # Get favorite teams data
+        # Get favorite teams data, fetching all teams in one query and keeping the user's order
         favorite_teams_data = []
-        for team_id in user.favorite_teams or []:
-            team = TeamModel.query.get(team_id)
-            if team:
-                favorite_teams_data.append({
-                    "id": team.id,
-                    "name": team.name,
-                    "logo_url": team.logo_url
-                })
-        
-        # Get favorite players data
+        if user.favorite_teams:
+            teams = {
+                team.id: team for team in db.session.execute(
+                    select(TeamModel.id, TeamModel.name, TeamModel.logo_url)
+                    .where(TeamModel.id.in_(user.favorite_teams))
+                )
+            }
+            for team_id in user.favorite_teams:
+                team = teams.get(team_id)
+                if team:
+                    favorite_teams_data.append({
+                        "id": team.id,
+                        "name": team.name,
+                        "logo_url": team.logo_url
+                    })
+        
+        # Get favorite players data the same way
         favorite_players_data = []
-        for player_id in user.favorite_players or []:
-            player = PlayerModel.query.get(player_id)
-            if player:
-                favorite_players_data.append({
-                    "id": player.id,
-                    "name": player.name,
-                    "profile_image": player.profile_image
-                })
+        if user.favorite_players:
+            players = {
+                player.id: player for player in db.session.execute(
+                    select(PlayerModel.id, PlayerModel.name, PlayerModel.profile_image)
+                    .where(PlayerModel.id.in_(user.favorite_players))
+                )
+            }
+            for player_id in user.favorite_players:
+                player = players.get(player_id)
+                if player:
+                    favorite_players_data.append({
+                        "id": player.id,
+                        "name": player.name,
+                        "profile_image": player.profile_image
+                    })
         
         # Construct complete profile response
         profile_data = {
@@ -301,7 +383,7 @@ def update_user_favorites(user_uuid):
     """Update a user's favorite sports, teams, and players"""
     try:
         # Find user by UUID
-        user = UserModel.query.filter_by(uuid=user_uuid).first()
+        user = _get_user_by_uuid(user_uuid)
         if not user:
             return format_error("User not found", status_code=404)
         
@@ -335,18 +417,22 @@ def update_user_favorites(user_uuid):
 def restrict_user(user_uuid):
     """Restrict a user by changing their status to 'suspended'"""
     try:
-        # Find user by UUID
-        user = UserModel.query.filter_by(uuid=user_uuid).first()
+        # Change status to suspended and read the updated row back in one statement
+        user = db.session.execute(
+            update(UserModel)
+            .where(UserModel.uuid == user_uuid)
+            .values(status='suspended')
+            .returning(*UserModel.__table__.columns)
+        ).first()
         if not user:
             return format_error("User not found", status_code=404)
         
-        # Change status to suspended
-        user.status = 'suspended'
         db.session.commit()
+        _stats_cache.clear()
         
         return format_response({
             "message": f"User {user.username} has been restricted",
-            "user": user.to_dict()
+            "user": UserModel.serialize(user)
         })
     except Exception as e:
         logger.error(f"Error restricting user with UUID {user_uuid}: {str(e)}")
@@ -355,11 +441,4 @@ def restrict_user(user_uuid):
 
 def get_sport_logo_url(sport_name):
     """Get a logo URL for a given sport name"""
-    # Map of sport names to their logo URLs
-    sport_logos = {
-        "NFL": "https://upload.wikimedia.org/wikipedia/en/thumb/a/a2/National_Football_League_logo.svg/800px-National_Football_League_logo.svg.png",
-        "NBA": "https://upload.wikimedia.org/wikipedia/en/thumb/0/03/National_Basketball_Association_logo.svg/800px-National_Basketball_Association_logo.svg.png",
-        "MLB": "https://upload.wikimedia.org/wikipedia/en/thumb/a/a6/Major_League_Baseball_logo.svg/800px-Major_League_Baseball_logo.svg.png",
-        "NCAA-Football": "https://upload.wikimedia.org/wikipedia/commons/thumb/d/dd/NCAA_logo.svg/800px-NCAA_logo.svg.png"
-    }
-    return sport_logos.get(sport_name, "https://placehold.co/400x400?text=Sport")
+    return SPORT_LOGOS.get(sport_name, DEFAULT_SPORT_LOGO)
@@ -11,12 +11,13 @@ Note: You need to have PostgreSQL installed before running this script.
 """
 
 import os
+import shutil
 import subprocess
 import sys
 import platform
 import getpass
-import psycopg2
-from psycopg2 import sql
+from functools import lru_cache
+from pathlib import Path
 
 # Colors for terminal output
 class Colors:
@@ -27,15 +28,16 @@ class Colors:
     BOLD = "\033[1m"
     END = "\033[0m"
 
+RULE = "=" * 80
+
 def print_colored(text, color):
     """Print colored text to the terminal"""
-    print(f"{color}{text}{Colors.END}")
+    sys.stdout.write(f"{color}{text}{Colors.END}\n")
 
 def print_header(text):
     """Print a header with formatting"""
-    print("\n" + "=" * 80)
-    print_colored(text, Colors.BOLD + Colors.BLUE)
-    print("=" * 80 + "\n")
+    sys.stdout.write(f"\n{RULE}\n{Colors.BOLD}{Colors.BLUE}{text}{Colors.END}\n{RULE}\n\n")
+    sys.stdout.flush()
 
 def print_step(text):
     """Print a step with formatting"""
@@ -49,37 +51,25 @@ def print_error(text):
     """Print an error with formatting"""
     print_colored(f"❌ {text}", Colors.BOLD + Colors.RED)
 
-def run_command(command, shell=True):
-    """Run a command and return its output"""
-    try:
-        result = subprocess.run(
-            command, 
-            shell=shell, 
-            check=True, 
-            text=True,
-            capture_output=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print_error(f"Command failed: {e}")
-        return None
-
+@lru_cache(maxsize=1)
 def find_postgres_bin_dir():
-    """Find PostgreSQL binary directory on Windows"""
+    """Find PostgreSQL binary directories on Windows, cached for the run"""
     possible_paths = []
     
     # Check Program Files
     for root_dir in ["C:\\Program Files\\PostgreSQL", "C:\\Program Files (x86)\\PostgreSQL"]:
-        if os.path.isdir(root_dir):
-            # Get all version directories
-            version_dirs = [os.path.join(root_dir, d) for d in os.listdir(root_dir) 
-                          if os.path.isdir(os.path.join(root_dir, d))]
-            
-            # Add bin directory for each version
-            for ver_dir in version_dirs:
-                bin_dir = os.path.join(ver_dir, "bin")
-                if os.path.isdir(bin_dir) and os.path.exists(os.path.join(bin_dir, "psql.exe")):
-                    possible_paths.append(bin_dir)
+        # Get all version directories; scandir reports entry types without a stat per entry
+        try:
+            with os.scandir(root_dir) as entries:
+                version_dirs = [entry.path for entry in entries if entry.is_dir()]
+        except OSError:
+            continue
+        
+        # Add bin directory for each version
+        for ver_dir in version_dirs:
+            bin_dir = os.path.join(ver_dir, "bin")
+            if os.path.isfile(os.path.join(bin_dir, "psql.exe")):
+                possible_paths.append(bin_dir)
     
     # Check for additional common installation paths
     additional_paths = [
@@ -89,15 +79,22 @@ def find_postgres_bin_dir():
     ]
     
     for path in additional_paths:
-        if os.path.isdir(path) and os.path.exists(os.path.join(path, "psql.exe")):
+        if os.path.isfile(os.path.join(path, "psql.exe")):
             possible_paths.append(path)
             
-    return possible_paths
+    return tuple(possible_paths)
 
 def check_postgres_installed():
     """Check if PostgreSQL is installed"""
     print_step("Checking if PostgreSQL is installed...")
     
+    # psql on PATH answers the question without scanning install directories
+    psql_path = shutil.which("psql")
+    if psql_path:
+        print_colored(f"Found PostgreSQL: {psql_path}", Colors.GREEN)
+        os.environ['PG_BIN_DIR'] = os.path.dirname(psql_path)
+        return True
+    
     if platform.system() == "Windows":
         # Find PostgreSQL bin directory
         postgres_bin_dirs = find_postgres_bin_dir()
@@ -106,8 +103,8 @@ def check_postgres_installed():
             print_colored(f"Found PostgreSQL installations in: {', '.join(postgres_bin_dirs)}", Colors.GREEN)
             
             # Check if any of the bin directories are in PATH
-            path_dirs = os.environ.get('PATH', '').split(os.pathsep)
-            in_path = any(bin_dir.lower() in [p.lower() for p in path_dirs] for bin_dir in postgres_bin_dirs)
+            path_dirs = {p.lower() for p in os.environ.get('PATH', '').split(os.pathsep)}
+            in_path = any(bin_dir.lower() in path_dirs for bin_dir in postgres_bin_dirs)
             
             if not in_path:
                 print_warning("PostgreSQL bin directory is not in your PATH environment variable.")
@@ -118,15 +115,6 @@ def check_postgres_installed():
         else:
             print_error("PostgreSQL installation not found in Program Files.")
             return False
-    else:
-        # For Unix-like systems
-        try:
-            version = run_command("psql --version")
-            if version:
-                print_colored(f"Found PostgreSQL: {version}", Colors.GREEN)
-                return True
-        except:
-            pass
     
     print_error("PostgreSQL is not installed or not in PATH.")
     return False
@@ -200,185 +188,174 @@ def get_database_config():
     
     return config
 
+def connect_as_postgres(config, admin_password, dbname):
+    """Open a psycopg2 connection to dbname as the postgres user
+
+    Without a password the connection goes over the local socket, where stock
+    Linux installs authenticate the postgres role by peer or trust instead.
+    """
+    import psycopg2
+    
+    if admin_password is None:
+        return psycopg2.connect(dbname=dbname, user="postgres", port=config['db_port'])
+    return psycopg2.connect(
+        dbname=dbname, user="postgres", password=admin_password,
+        host=config['db_host'], port=config['db_port']
+    )
+
+def create_db_objects(config, admin_password):
+    """Create the user and database and grant privileges as the postgres user"""
+    from psycopg2 import sql
+    
+    user = sql.Identifier(config['db_user'])
+    database = sql.Identifier(config['db_name'])
+    
+    conn = connect_as_postgres(config, admin_password, "postgres")
+    # CREATE DATABASE cannot run inside a transaction block
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            # Skip the user and database if they already exist so the script can be re-run
+            cursor.execute("SELECT 1 FROM pg_catalog.pg_roles WHERE rolname = %s", (config['db_user'],))
+            if cursor.fetchone() is None:
+                cursor.execute(
+                    sql.SQL("CREATE USER {} WITH PASSWORD %s").format(user),
+                    (config['db_password'],)
+                )
+            
+            cursor.execute("SELECT 1 FROM pg_catalog.pg_database WHERE datname = %s", (config['db_name'],))
+            if cursor.fetchone() is None:
+                cursor.execute(sql.SQL("CREATE DATABASE {}").format(database))
+            
+            cursor.execute(sql.SQL("GRANT ALL PRIVILEGES ON DATABASE {} TO {}").format(database, user))
+    finally:
+        conn.close()
+    
+    # Schema privileges are per database, so grant them from inside the new one
+    conn = connect_as_postgres(config, admin_password, config['db_name'])
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute(sql.SQL(
+                """
+                GRANT ALL PRIVILEGES ON SCHEMA public TO {user};
+                ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO {user};
+                """
+            ).format(user=user))
+    finally:
+        conn.close()
+
+# Same statements as create_db_objects, for psql; the values are set as psql variables
+PSQL_SETUP_SCRIPT = r"""
+SELECT format('CREATE USER %I WITH PASSWORD %L', :'db_user', :'db_password')
+WHERE NOT EXISTS (SELECT 1 FROM pg_catalog.pg_roles WHERE rolname = :'db_user')\gexec
+SELECT format('CREATE DATABASE %I', :'db_name')
+WHERE NOT EXISTS (SELECT 1 FROM pg_catalog.pg_database WHERE datname = :'db_name')\gexec
+GRANT ALL PRIVILEGES ON DATABASE :"db_name" TO :"db_user";
+\connect :"db_name"
+GRANT ALL PRIVILEGES ON SCHEMA public TO :"db_user";
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO :"db_user";
+"""
+
+def psql_literal(value):
+    """Quote value as a single-quoted psql meta-command argument"""
+    return "'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
+
+def create_db_objects_with_sudo(config):
+    """Create the user and database by running psql as the postgres system user"""
+    if not shutil.which("sudo"):
+        return False
+    
+    # Variables go through stdin rather than argv so the password doesn't show up in ps
+    variables = "".join(
+        f"\\set {name} {psql_literal(config[name])}\n" for name in ("db_user", "db_password", "db_name")
+    )
+    
+    print_warning("You may be prompted for your sudo password.")
+    command = ["sudo", "-u", "postgres", "psql", "-p", config['db_port'], "-v", "ON_ERROR_STOP=1"]
+    return subprocess.run(command, input=variables + PSQL_SETUP_SCRIPT, text=True).returncode == 0
+
 def create_postgres_db(config):
     """Create PostgreSQL database and user"""
     print_header("Creating PostgreSQL Database")
     
     print_step("Creating database and user...")
     
-    # SQL commands to create user and database
-    sql_commands = f"""
-    DO $$
-    BEGIN
-        IF NOT EXISTS (SELECT FROM pg_catalog.pg_user WHERE usename = '{config['db_user']}') THEN
-            CREATE USER {config['db_user']} WITH PASSWORD '{config['db_password']}';
-        END IF;
-    END
-    $$;
-
-    CREATE DATABASE {config['db_name']};
-    GRANT ALL PRIVILEGES ON DATABASE {config['db_name']} TO {config['db_user']};
-    """
+    # Imported here so the install checks and guide run without psycopg2 loaded
+    import psycopg2
     
-    # Write SQL to a temporary file
-    temp_sql_file = "temp_db_setup.sql"
-    with open(temp_sql_file, "w") as f:
-        f.write(sql_commands)
+    if platform.system() != "Windows":
+        # Stock Linux installs only admit the postgres role through peer authentication,
+        # so try the local socket and then sudo before asking for a password
+        try:
+            create_db_objects(config, None)
+            print_colored("Database and user created successfully!", Colors.GREEN)
+            return True
+        except psycopg2.OperationalError:
+            pass
+        except psycopg2.Error as e:
+            print_error(f"Failed to create database: {e}")
+            return False
+        
+        print_step("Retrying as the postgres system user...")
+        if create_db_objects_with_sudo(config):
+            print_colored("Database and user created successfully!", Colors.GREEN)
+            return True
+        print_warning("Could not connect through peer authentication; falling back to a password.")
     
-    # Run the SQL commands as the postgres user
+    admin_password = getpass.getpass("Password for the 'postgres' user: ")
     try:
-        if platform.system() == "Windows":
-            # On Windows, use the psql command directly
-            print_warning("You may be prompted for the password of the 'postgres' user.")
-            
-            # Get the PostgreSQL bin directory
-            psql_path = "psql"
-            if 'PG_BIN_DIR' in os.environ:
-                psql_path = os.path.join(os.environ['PG_BIN_DIR'], "psql")
-                
-            cmd = f'"{psql_path}" -U postgres -f {temp_sql_file}'
-            print_colored(f"Running command: {cmd}", Colors.BLUE)
-            
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                check=True,
-                text=True
-            )
-        else:
-            # On Unix-like systems, use sudo to switch to the postgres user
-            print_warning("You may be prompted for your sudo password.")
-            result = subprocess.run(
-                f'sudo -u postgres psql -f {temp_sql_file}',
-                shell=True,
-                check=True,
-                text=True
-            )
-        
-        print_colored("Database and user created successfully!", Colors.GREEN)
-        return True
-    except subprocess.CalledProcessError as e:
+        create_db_objects(config, admin_password)
+    except psycopg2.Error as e:
         print_error(f"Failed to create database: {e}")
-        
-        if platform.system() == "Windows":
-            # Give additional guidance
-            print_warning("This could be due to PostgreSQL binaries not being in your PATH.")
-            postgres_bin_dirs = find_postgres_bin_dir()
-            if postgres_bin_dirs:
-                print_colored("Try running the following commands:", Colors.YELLOW)
-                bin_dir = postgres_bin_dirs[0]
-                print(f"1. set PATH=%PATH%;{bin_dir}")
-                print(f"2. Run this script again")
-            else:
-                print_warning("Make sure PostgreSQL is installed correctly.")
-        
+        print_warning("Check that the PostgreSQL service is running and the 'postgres' password is correct.")
         return False
-    finally:
-        # Remove the temporary SQL file
-        if os.path.exists(temp_sql_file):
-            os.remove(temp_sql_file)
-
-def create_env_file(config):
-    """Create .env file with database configuration"""
-    print_header("Creating Environment File")
     
-    # Create the DATABASE_URL
+    print_colored("Database and user created successfully!", Colors.GREEN)
+    return True
+
+# Placeholder settings written next to DATABASE_URL in every environment file
+DEFAULT_ENV = {
+    "SESSION_SECRET": "change_this_to_a_secure_random_string",
+    "JWT_SECRET_KEY": "change_this_to_a_secure_random_string",
+    "FLASK_ENV": "development",
+}
+
+def build_env(config):
+    """Build the environment variables shared by .env, set_env.bat and set_env.sh"""
     db_url = f"postgresql://{config['db_user']}:{config['db_password']}@{config['db_host']}:{config['db_port']}/{config['db_name']}"
-    
-    # Content of .env file
-    env_content = f"""# Database configuration
-DATABASE_URL={db_url}
-
-# Secret keys
-SESSION_SECRET=change_this_to_a_secure_random_string
-JWT_SECRET_KEY=change_this_to_a_secure_random_string
+    return {"DATABASE_URL": db_url, **DEFAULT_ENV}
 
-# Flask environment
-FLASK_ENV=development
-"""
-    
-    # Write to .env file
-    with open(".env", "w") as f:
-        f.write(env_content)
+def create_env_file(env):
+    """Create .env file with database configuration"""
+    lines = "".join(f"{key}={value}\n" for key, value in env.items())
+    Path(".env").write_text(f"# Environment variables for Gambit Admin\n{lines}")
     
     print_colored(".env file created successfully!", Colors.GREEN)
     print_warning("Note: You should change the secret keys to secure random strings in production.")
-    
-    return db_url
 
-def create_env_bat(db_url):
+def create_env_bat(env):
     """Create set_env.bat for Windows users"""
-    bat_content = f"""@echo off
-REM Environment variables for Gambit Admin
-
-set DATABASE_URL={db_url}
-set SESSION_SECRET=change_this_to_a_secure_random_string
-set JWT_SECRET_KEY=change_this_to_a_secure_random_string
-set FLASK_ENV=development
-
-echo Environment variables set successfully!
-"""
-    
-    with open("set_env.bat", "w") as f:
-        f.write(bat_content)
+    lines = "".join(f"set {key}={value}\n" for key, value in env.items())
+    Path("set_env.bat").write_text(
+        f"@echo off\nREM Environment variables for Gambit Admin\n\n{lines}\n"
+        "echo Environment variables set successfully!\n"
+    )
     
     print_colored("set_env.bat file created for Windows users.", Colors.GREEN)
 
-def create_env_sh(db_url):
+def create_env_sh(env):
     """Create set_env.sh for Unix users"""
-    sh_content = f"""#!/bin/bash
-# Environment variables for Gambit Admin
-
-export DATABASE_URL="{db_url}"
-export SESSION_SECRET="change_this_to_a_secure_random_string"
-export JWT_SECRET_KEY="change_this_to_a_secure_random_string"
-export FLASK_ENV="development"
-
-echo "Environment variables set successfully!"
-"""
-    
-    with open("set_env.sh", "w") as f:
-        f.write(sh_content)
+    lines = "".join(f'export {key}="{value}"\n' for key, value in env.items())
+    Path("set_env.sh").write_text(
+        f"#!/bin/bash\n# Environment variables for Gambit Admin\n\n{lines}\n"
+        'echo "Environment variables set successfully!"\n'
+    )
     
     # Make the file executable
     os.chmod("set_env.sh", 0o755)
     
     print_colored("set_env.sh file created for Unix users.", Colors.GREEN)
 
-def setup_database():
-    """Grant privileges to the user on the public schema"""
-    db_name = "gambit_admin"
-    db_user = "gambit_user"
-    db_password = "muneeb"  # Replace with the actual password
-    db_host = "localhost"  # Update if hosted elsewhere
-    db_port = "5432"  # Default PostgreSQL port
-
-    try:
-        # Connect to the PostgreSQL server as a superuser
-        conn = psycopg2.connect(
-            dbname="postgres", user="postgres", password="muneeb", host=db_host, port=db_port
-        )
-        conn.autocommit = True
-        cursor = conn.cursor()
-
-        # Grant privileges to the user
-        cursor.execute(sql.SQL(
-            """
-            GRANT ALL PRIVILEGES ON SCHEMA public TO {user};
-            ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO {user};
-            """
-        ).format(user=sql.Identifier(db_user)))
-
-        print(f"Privileges granted to user '{db_user}' on schema 'public'.")
-
-    except Exception as e:
-        print(f"Error: {e}")
-
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
-
 def main():
     """Main function to run the setup script"""
     print_header("Gambit Admin PostgreSQL Setup")
@@ -392,15 +369,12 @@ def main():
     
     # Create database and user
     if create_postgres_db(config):
-        # Grant privileges to the user
-        setup_database()
-        
-        # Create environment files
-        db_url = create_env_file(config)
-        
-        # Create platform-specific environment scripts
-        create_env_bat(db_url)
-        create_env_sh(db_url)
+        # Create the .env file and platform-specific environment scripts
+        env = build_env(config)
+        print_header("Creating Environment Files")
+        create_env_file(env)
+        create_env_bat(env)
+        create_env_sh(env)
         
         print_header("Setup Complete")
         print("""
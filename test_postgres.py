@@ -8,16 +8,33 @@ Run this after setting up your database with setup_postgres.py.
 import os
 import sys
 import time
-from dotenv import load_dotenv
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
 import sqlalchemy
-from sqlalchemy import text
+from sqlalchemy import column, func, insert, table, text
+
+# Scratch table used to check write access
+CONNECTION_TEST = table("connection_test", column("test_data"))
+
+@lru_cache(maxsize=1)
+def get_engine(database_url):
+    """Return a pooled engine for database_url, created once so repeated checks reuse connections"""
+    return sqlalchemy.create_engine(
+        database_url,
+        pool_size=5,
+        max_overflow=10,
+        pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        pool_pre_ping=True,
+    )
 
 def test_connection():
     """Test the connection to PostgreSQL database"""
     print("\n=== Testing PostgreSQL Connection ===\n")
     
-    # Try to load from .env file first
-    load_dotenv()
+    # Fall back to the .env file only when the environment doesn't already provide the URL
+    if "DATABASE_URL" not in os.environ:
+        from dotenv import load_dotenv
+        load_dotenv()
     
     # Get DATABASE_URL
     database_url = os.environ.get("DATABASE_URL")
@@ -29,59 +46,56 @@ def test_connection():
     # Print redacted database URL for verification
     # Redact password for security
     redacted_url = database_url
-    if "@" in database_url and ":" in database_url:
-        parts = database_url.split("@")
-        credentials = parts[0].split("://")[1].split(":")
-        redacted_url = f"{parts[0].split('://')[0]}://{credentials[0]}:****@{parts[1]}"
+    parts = urlsplit(database_url)
+    if parts.password is not None:
+        host = parts.netloc.rpartition("@")[2]
+        redacted_url = urlunsplit(parts._replace(netloc=f"{parts.username}:****@{host}"))
     
     print(f"Database URL: {redacted_url}")
     print("Attempting to connect to PostgreSQL...")
     
     # Try to connect to the database
     try:
-        engine = sqlalchemy.create_engine(database_url)
-        connection = engine.connect()
-        
-        # Execute a simple query to test the connection
-        result = connection.execute(text("SELECT version();"))
-        version = result.fetchone()[0]
-        
-        print(f"\n✅ Connection successful!")
-        print(f"PostgreSQL version: {version}")
-        
-        # Test if we can create a table
-        print("\nTesting table creation...")
-        try:
-            connection.execute(text("""
-                CREATE TABLE IF NOT EXISTS connection_test (
-                    id SERIAL PRIMARY KEY,
-                    test_data TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """))
-            
-            # Insert a test row
-            connection.execute(text("""
-                INSERT INTO connection_test (test_data) 
-                VALUES ('Connection test at ' || NOW());
-            """))
-            
-            # Retrieve the data
-            result = connection.execute(text("SELECT * FROM connection_test;"))
-            rows = result.fetchall()
-            
-            print(f"✅ Table creation and data insertion successful!")
-            print(f"Rows in test table: {len(rows)}")
-            
-            # Clean up the test table
-            connection.execute(text("DROP TABLE connection_test;"))
-            print("Test table cleaned up.")
+        # Run every statement in a single transaction that commits once
+        with get_engine(database_url).begin() as connection:
+            # Execute a simple query to test the connection
+            version = connection.execute(text("SELECT version();")).scalar()
             
-        except Exception as e:
-            print(f"❌ Failed to create/use test table: {e}")
-            print("You may not have proper permissions on this database.")
+            print(f"\n✅ Connection successful!")
+            print(f"PostgreSQL version: {version}")
             
-        connection.close()
+            # Test if we can create a table
+            print("\nTesting table creation...")
+            try:
+                # A savepoint keeps a failure here from aborting the outer transaction
+                with connection.begin_nested():
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS connection_test (
+                            id SERIAL PRIMARY KEY,
+                            test_data TEXT,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        );
+                    """))
+                    
+                    # Insert a test row in a single INSERT statement
+                    connection.execute(insert(CONNECTION_TEST).values(
+                        test_data=func.concat("Connection test at ", func.now())
+                    ))
+                    
+                    # Retrieve the data
+                    result = connection.execute(text("SELECT * FROM connection_test;"))
+                    rows = result.fetchall()
+                    
+                    print(f"✅ Table creation and data insertion successful!")
+                    print(f"Rows in test table: {len(rows)}")
+                    
+                    # Clean up the test table
+                    connection.execute(text("DROP TABLE connection_test;"))
+                    print("Test table cleaned up.")
+                
+            except Exception as e:
+                print(f"❌ Failed to create/use test table: {e}")
+                print("You may not have proper permissions on this database.")
         
     except Exception as e:
         print(f"\n❌ Connection failed: {e}")
@@ -1,134 +1,260 @@
 import pytest
 import os
-import json
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from flask_jwt_extended import create_access_token
+from functools import lru_cache
+from sqlalchemy import event, insert, make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# Use the cheapest bcrypt cost; it is read when the app and models are imported
+os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+
+# Under pytest-xdist every worker gets its own PostgreSQL schema so parallel runs
+# don't share tables
+WORKER_SCHEMA = None
+if os.environ.get('PYTEST_XDIST_WORKER') and os.environ.get('DATABASE_URL', '').startswith('postgres'):
+    WORKER_SCHEMA = f"test_{os.environ['PYTEST_XDIST_WORKER']}"
+    os.environ['DATABASE_URL'] = make_url(os.environ['DATABASE_URL']).update_query_dict(
+        {'options': f'-csearch_path={WORKER_SCHEMA}'}
+    ).render_as_string(hide_password=False)
+
 from app import app, db
 from models import (
-    AdminModel, RoleModel, UserModel, SubscriberModel, LeagueModel, 
+    bcrypt, AdminModel, RoleModel, UserModel, SubscriberModel, LeagueModel, 
     TeamModel, PlayerModel, ReelModel, NotificationModel, PermissionType
 )
+from routes.users import _stats_cache
+from utils.auth import create_auth_token, invalidate_admin_access
 
-@pytest.fixture
-def client():
-    """Create a test client for the app with app_context."""
+@lru_cache(maxsize=None)
+def password_hash(password):
+    """Hash a fixture password once and reuse it for every test."""
+    return bcrypt.generate_password_hash(password).decode('utf-8')
+
+def bulk_create(model, rows):
+    """Insert rows in one executemany INSERT and return the created objects in order."""
+    return db.session.scalars(
+        insert(model).returning(model, sort_by_parameter_order=True), rows
+    ).all()
+
+@contextmanager
+def seeding(app):
+    """Commit rows that are shared by every test, outside any per-test transaction.
+    
+    The objects are detached with their loaded state, so tests can attach
+    them to their own session with merge(load=False).
+    """
+    with app.app_context():
+        yield
+        db.session.expunge_all()
+        db.session.commit()
+        db.session.remove()
+
+@pytest.fixture(scope='session')
+def app_session():
+    """Configure the app and create the schema once for the whole test run."""
+    # The engine is built from DATABASE_URL when app is imported, so the database
+    # is chosen there; the models use PostgreSQL types, so it must be PostgreSQL
     app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     app.config['JWT_SECRET_KEY'] = 'test-key'
     
-    with app.test_client() as client:
-        with app.app_context():
-            db.create_all()
-            yield client
-            db.session.remove()
-            db.drop_all()
+    with app.app_context():
+        if WORKER_SCHEMA:
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS {WORKER_SCHEMA}')
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+        if WORKER_SCHEMA:
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql(f'DROP SCHEMA IF EXISTS {WORKER_SCHEMA} CASCADE')
 
 @pytest.fixture
-def setup_roles():
-    """Set up test roles with different permissions."""
-    # Create Admin role with all permissions
-    admin_role = RoleModel(name='Admin', description='Administrator', permissions=[PermissionType.ALL])
+def db_session(app_session):
+    """Run each test inside an outer transaction that is rolled back afterwards.
     
-    # Content Manager role
-    content_role = RoleModel(name='Content Manager', description='Manages content', 
-                           permissions=[PermissionType.CONTENT, PermissionType.REELS])
+    Setup fixtures only flush; their rows are committed together right before
+    the test body runs. Commits there and in routes only release a SAVEPOINT,
+    so every test starts from the session-wide seed data (the seed_* fixtures)
+    without recreating it.
     
-    # User Manager role
-    user_role = RoleModel(name='User Manager', description='Manages users', 
-                        permissions=[PermissionType.USERS, PermissionType.SUBSCRIBERS])
+    Seed rows are committed once for the whole run. Tests may change them
+    through this session, but must not do so outside it (e.g. on a separate
+    connection or with db.engine directly), or the change will leak into
+    later tests.
+    """
+    with app_session.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        app_scoped_session = db.session
+        db.session = scoped_session(sessionmaker(
+            bind=connection, query_cls=db.Query, join_transaction_mode='create_savepoint'
+        ))
+        
+        # Cached lookups may still describe rows from a rolled back test
+        invalidate_admin_access()
+        _stats_cache.clear()
+        
+        yield db.session
+        
+        db.session.remove()
+        db.session = app_scoped_session
+        transaction.rollback()
+        connection.close()
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_call(item):
+    """Commit everything the setup fixtures flushed in one go, just before the test body runs."""
+    session = item.funcargs.get('db_session')
+    if session is not None:
+        session.commit()
+
+@pytest.fixture
+def client(app_session, db_session):
+    """Create a test client for the app with app_context."""
+    with app_session.test_client() as client:
+        yield client
+
+@pytest.fixture
+def query_counter(client):
+    """Record the SQL statements executed while the test runs.
     
-    # League Manager role
-    league_role = RoleModel(name='League Manager', description='Manages leagues', 
-                          permissions=[PermissionType.LEAGUES])
+    SAVEPOINT bookkeeping from the per-test transaction is left out.
+    """
+    statements = []
     
-    db.session.add_all([admin_role, content_role, user_role, league_role])
-    db.session.commit()
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')):
+            statements.append(statement)
     
-    return {
-        'admin_role': admin_role,
-        'content_role': content_role, 
-        'user_role': user_role,
-        'league_role': league_role
-    }
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
 
-@pytest.fixture
-def setup_admins(setup_roles):
-    """Set up test admin users with different roles."""
-    # Super admin with all permissions
-    super_admin = AdminModel(
-        username='superadmin',
-        name='Super Admin',
-        email='super@gambitadmin.com',
-        is_active=True
-    )
-    super_admin.set_password('superadmin123')
-    super_admin.roles.append(setup_roles['admin_role'])
+@pytest.fixture(scope='session')
+def seed_roles(app_session):
+    """Create the test roles once for the whole run."""
+    with seeding(app_session):
+        # Create Admin role with all permissions
+        admin_role = RoleModel(name='Admin', description='Administrator', permissions=[PermissionType.ALL])
     
-    # Content manager
-    content_admin = AdminModel(
-        username='contentadmin',
-        name='Content Admin',
-        email='content@gambitadmin.com',
-        is_active=True
-    )
-    content_admin.set_password('content123')
-    content_admin.roles.append(setup_roles['content_role'])
+        # Content Manager role
+        content_role = RoleModel(name='Content Manager', description='Manages content', 
+                               permissions=[PermissionType.CONTENT, PermissionType.REELS])
     
-    # User manager
-    user_admin = AdminModel(
-        username='useradmin',
-        name='User Admin',
-        email='user@gambitadmin.com',
-        is_active=True
-    )
-    user_admin.set_password('user123')
-    user_admin.roles.append(setup_roles['user_role'])
+        # User Manager role
+        user_role = RoleModel(name='User Manager', description='Manages users', 
+                            permissions=[PermissionType.USERS, PermissionType.SUBSCRIBERS])
     
-    # League manager
-    league_admin = AdminModel(
-        username='leagueadmin',
-        name='League Admin',
-        email='league@gambitadmin.com',
-        is_active=True
-    )
-    league_admin.set_password('league123')
-    league_admin.roles.append(setup_roles['league_role'])
+        # League Manager role
+        league_role = RoleModel(name='League Manager', description='Manages leagues', 
+                              permissions=[PermissionType.LEAGUES])
+    
+        db.session.add_all([admin_role, content_role, user_role, league_role])
+        db.session.flush()
+    
+        return {
+            'admin_role': admin_role,
+            'content_role': content_role, 
+            'user_role': user_role,
+            'league_role': league_role
+        }
+
+@pytest.fixture
+def setup_roles(db_session, seed_roles):
+    """Set up test roles with different permissions."""
+    return {key: db_session.merge(role, load=False) for key, role in seed_roles.items()}
+
+@pytest.fixture(scope='session')
+def seed_admins(app_session, seed_roles):
+    """Create the test admins once for the whole run."""
+    with seeding(app_session):
+        roles = {key: db.session.merge(role, load=False) for key, role in seed_roles.items()}
+        
+        # Super admin with all permissions
+        super_admin = AdminModel(
+            username='superadmin',
+            name='Super Admin',
+            email='super@gambitadmin.com',
+            is_active=True
+        )
+        super_admin.password_hash = password_hash('superadmin123')
+        super_admin.roles.append(roles['admin_role'])
     
-    # Inactive admin
-    inactive_admin = AdminModel(
-        username='inactiveadmin',
-        name='Inactive Admin',
-        email='inactive@gambitadmin.com',
-        is_active=False
-    )
-    inactive_admin.set_password('inactive123')
-    inactive_admin.roles.append(setup_roles['admin_role'])
+        # Content manager
+        content_admin = AdminModel(
+            username='contentadmin',
+            name='Content Admin',
+            email='content@gambitadmin.com',
+            is_active=True
+        )
+        content_admin.password_hash = password_hash('content123')
+        content_admin.roles.append(roles['content_role'])
     
-    db.session.add_all([super_admin, content_admin, user_admin, league_admin, inactive_admin])
-    db.session.commit()
+        # User manager
+        user_admin = AdminModel(
+            username='useradmin',
+            name='User Admin',
+            email='user@gambitadmin.com',
+            is_active=True
+        )
+        user_admin.password_hash = password_hash('user123')
+        user_admin.roles.append(roles['user_role'])
     
-    return {
-        'super_admin': super_admin,
-        'content_admin': content_admin,
-        'user_admin': user_admin,
-        'league_admin': league_admin,
-        'inactive_admin': inactive_admin
-    }
+        # League manager
+        league_admin = AdminModel(
+            username='leagueadmin',
+            name='League Admin',
+            email='league@gambitadmin.com',
+            is_active=True
+        )
+        league_admin.password_hash = password_hash('league123')
+        league_admin.roles.append(roles['league_role'])
+    
+        # Inactive admin
+        inactive_admin = AdminModel(
+            username='inactiveadmin',
+            name='Inactive Admin',
+            email='inactive@gambitadmin.com',
+            is_active=False
+        )
+        inactive_admin.password_hash = password_hash('inactive123')
+        inactive_admin.roles.append(roles['admin_role'])
+    
+        db.session.add_all([super_admin, content_admin, user_admin, league_admin, inactive_admin])
+        db.session.flush()
+        
+        return {
+            'super_admin': super_admin,
+            'content_admin': content_admin,
+            'user_admin': user_admin,
+            'league_admin': league_admin,
+            'inactive_admin': inactive_admin
+        }
 
 @pytest.fixture
-def auth_tokens(setup_admins):
-    """Create JWT tokens for each admin type."""
-    tokens = {}
-    for admin_type, admin in setup_admins.items():
-        tokens[admin_type] = create_access_token(identity=admin.id)
-    return tokens
+def setup_admins(db_session, setup_roles, seed_admins):
+    """Set up test admin users with different roles."""
+    return {key: db_session.merge(admin, load=False) for key, admin in seed_admins.items()}
+
+@pytest.fixture(scope='session')
+def auth_tokens(app_session, seed_admins):
+    """Create JWT tokens for each admin type, signed the same way as at login."""
+    with app_session.app_context():
+        return {admin_type: create_auth_token(admin.id) for admin_type, admin in seed_admins.items()}
+
+@pytest.fixture(scope='session')
+def auth_headers(auth_tokens):
+    """Authorization headers for each admin type."""
+    return {admin_type: auth_header(token) for admin_type, token in auth_tokens.items()}
 
 @pytest.fixture
-def setup_users():
+def setup_users(db_session):
     """Set up test users."""
     users = []
     for i in range(1, 6):
-        user = UserModel(
+        user = dict(
             uuid=f"user-{i}-uuid",
             email=f"user{i}@example.com",
             username=f"user{i}",
@@ -144,128 +270,140 @@ def setup_users():
         )
         users.append(user)
     
-    db.session.add_all(users)
-    db.session.commit()
+    return bulk_create(UserModel, users)
+
+@pytest.fixture(scope='session')
+def seed_subscribers(app_session):
+    """Create the test subscribers once for the whole run."""
+    with seeding(app_session):
+        subscribers = []
+        for i in range(1, 6):
+            subscriber = dict(
+                email=f"subscriber{i}@example.com",
+                name=f"Subscriber {i}",
+                subscription_type="monthly" if i % 2 == 0 else "yearly",
+                start_date=datetime.now() - timedelta(days=30),
+                end_date=datetime.now() + timedelta(days=30 if i % 2 == 0 else 365),
+                status="active" if i < 4 else "expired" if i == 4 else "cancelled"
+            )
+            subscribers.append(subscriber)
     
-    return users
+        return bulk_create(SubscriberModel, subscribers)
 
 @pytest.fixture
-def setup_subscribers():
+def setup_subscribers(db_session, seed_subscribers):
     """Set up test subscribers."""
-    subscribers = []
-    for i in range(1, 6):
-        subscriber = SubscriberModel(
-            email=f"subscriber{i}@example.com",
-            name=f"Subscriber {i}",
-            subscription_type="monthly" if i % 2 == 0 else "yearly",
-            start_date=datetime.now() - timedelta(days=30),
-            end_date=datetime.now() + timedelta(days=30 if i % 2 == 0 else 365),
-            status="active" if i < 4 else "expired" if i == 4 else "cancelled"
-        )
-        subscribers.append(subscriber)
+    return [db_session.merge(subscriber, load=False) for subscriber in seed_subscribers]
+
+@pytest.fixture(scope='session')
+def seed_leagues(app_session):
+    """Create the test leagues once for the whole run."""
+    with seeding(app_session):
+        leagues = []
+        categories = ["football", "basketball", "baseball", "hockey", "soccer"]
+        countries = ["USA", "Canada", "UK", "Spain", "Germany"]
     
-    db.session.add_all(subscribers)
-    db.session.commit()
+        for i in range(1, 6):
+            league = dict(
+                name=f"League {i}",
+                category=categories[i-1],
+                country=countries[i-1],
+                logo_url=f"https://example.com/logos/league{i}.png",
+                popularity=100 - i*10,
+                founded_date=datetime(1900 + i*20, 1, 1),
+                headquarters=f"City {i}",
+                commissioner=f"Commissioner {i}",
+                divisions=[f"Division {j}" for j in range(1, 4)],
+                num_teams=10 + i,
+                enabled=True if i < 5 else False
+            )
+            leagues.append(league)
     
-    return subscribers
+        return bulk_create(LeagueModel, leagues)
 
 @pytest.fixture
-def setup_leagues():
+def setup_leagues(db_session, seed_leagues):
     """Set up test leagues."""
-    leagues = []
-    categories = ["football", "basketball", "baseball", "hockey", "soccer"]
-    countries = ["USA", "Canada", "UK", "Spain", "Germany"]
-    
-    for i in range(1, 6):
-        league = LeagueModel(
-            name=f"League {i}",
-            category=categories[i-1],
-            country=countries[i-1],
-            logo_url=f"https://example.com/logos/league{i}.png",
-            popularity=100 - i*10,
-            founded_date=datetime(1900 + i*20, 1, 1),
-            headquarters=f"City {i}",
-            commissioner=f"Commissioner {i}",
-            divisions=[f"Division {j}" for j in range(1, 4)],
-            num_teams=10 + i,
-            enabled=True if i < 5 else False
-        )
-        leagues.append(league)
-    
-    db.session.add_all(leagues)
-    db.session.commit()
+    return [db_session.merge(league, load=False) for league in seed_leagues]
+
+@pytest.fixture(scope='session')
+def seed_teams(app_session, seed_leagues):
+    """Create the test teams once for the whole run."""
+    with seeding(app_session):
+        teams = []
+        for league_idx, league in enumerate(seed_leagues):
+            for i in range(1, 4):  # 3 teams per league
+                team = dict(
+                    name=f"Team {league_idx+1}-{i}",
+                    league_id=league.id,
+                    logo_url=f"https://example.com/logos/team{league_idx+1}-{i}.png",
+                    popularity=90 - (league_idx*10) - i
+                )
+                teams.append(team)
     
-    return leagues
+        return bulk_create(TeamModel, teams)
 
 @pytest.fixture
-def setup_teams(setup_leagues):
+def setup_teams(db_session, seed_teams):
     """Set up test teams."""
-    teams = []
-    for league_idx, league in enumerate(setup_leagues):
-        for i in range(1, 4):  # 3 teams per league
-            team = TeamModel(
-                name=f"Team {league_idx+1}-{i}",
-                league_id=league.id,
-                logo_url=f"https://example.com/logos/team{league_idx+1}-{i}.png",
-                popularity=90 - (league_idx*10) - i
-            )
-            teams.append(team)
+    return [db_session.merge(team, load=False) for team in seed_teams]
+
+@pytest.fixture(scope='session')
+def seed_players(app_session, seed_teams, seed_leagues):
+    """Create the test players once for the whole run."""
+    with seeding(app_session):
+        players = []
+        positions = ["Forward", "Guard", "Center", "Pitcher", "Catcher"]
     
-    db.session.add_all(teams)
-    db.session.commit()
+        for team_idx, team in enumerate(seed_teams):
+            for i in range(1, 3):  # 2 players per team
+                player = dict(
+                    name=f"Player {team_idx+1}-{i}",
+                    team_id=team.id,
+                    league_id=team.league_id,
+                    position=positions[team_idx % len(positions)],
+                    jersey_number=str(i),
+                    profile_image=f"https://example.com/players/player{team_idx+1}-{i}.png",
+                    dob=datetime(1990 - team_idx, 1, i),
+                    college=f"University {team_idx+1}",
+                    height_weight=f"{180+i} cm, {80+i} kg",
+                    bat_throw=f"{'Right' if i % 2 == 0 else 'Left'}",
+                    experience=f"{team_idx+i} years",
+                    birthplace=f"City {team_idx+i}",
+                    status="Active"
+                )
+                players.append(player)
     
-    return teams
+        return bulk_create(PlayerModel, players)
 
 @pytest.fixture
-def setup_players(setup_teams, setup_leagues):
+def setup_players(db_session, seed_players):
     """Set up test players."""
-    players = []
-    positions = ["Forward", "Guard", "Center", "Pitcher", "Catcher"]
-    
-    for team_idx, team in enumerate(setup_teams):
-        for i in range(1, 3):  # 2 players per team
-            player = PlayerModel(
-                name=f"Player {team_idx+1}-{i}",
-                team_id=team.id,
-                league_id=team.league_id,
-                position=positions[team_idx % len(positions)],
-                jersey_number=str(i),
-                profile_image=f"https://example.com/players/player{team_idx+1}-{i}.png",
-                dob=datetime(1990 - team_idx, 1, i),
-                college=f"University {team_idx+1}",
-                height_weight=f"{180+i} cm, {80+i} kg",
-                bat_throw=f"{'Right' if i % 2 == 0 else 'Left'}",
-                experience=f"{team_idx+i} years",
-                birthplace=f"City {team_idx+i}",
-                status="Active"
-            )
-            players.append(player)
-    
-    db.session.add_all(players)
-    db.session.commit()
+    return [db_session.merge(player, load=False) for player in seed_players]
+
+@pytest.fixture(scope='session')
+def seed_reels(app_session, seed_players):
+    """Create the test reels once for the whole run."""
+    with seeding(app_session):
+        reels = []
+        for player_idx, player in enumerate(seed_players):
+            for i in range(1, 3):  # 2 reels per player
+                reel = dict(
+                    player_id=player.id,
+                    title=f"Amazing Play by {player.name} - {i}",
+                    thumbnail_url=f"https://example.com/thumbnails/reel{player_idx+1}-{i}.jpg",
+                    video_url=f"https://example.com/videos/reel{player_idx+1}-{i}.mp4",
+                    duration=30.0 + (player_idx * 5),
+                    view_count=1000 - (player_idx * 100 + i * 10)
+                )
+                reels.append(reel)
     
-    return players
+        return bulk_create(ReelModel, reels)
 
 @pytest.fixture
-def setup_reels(setup_players):
+def setup_reels(db_session, seed_reels):
     """Set up test reels."""
-    reels = []
-    for player_idx, player in enumerate(setup_players):
-        for i in range(1, 3):  # 2 reels per player
-            reel = ReelModel(
-                player_id=player.id,
-                title=f"Amazing Play by {player.name} - {i}",
-                thumbnail_url=f"https://example.com/thumbnails/reel{player_idx+1}-{i}.jpg",
-                video_url=f"https://example.com/videos/reel{player_idx+1}-{i}.mp4",
-                duration=30.0 + (player_idx * 5),
-                view_count=1000 - (player_idx * 100 + i * 10)
-            )
-            reels.append(reel)
-    
-    db.session.add_all(reels)
-    db.session.commit()
-    
-    return reels
+    return [db_session.merge(reel, load=False) for reel in seed_reels]
 
 @pytest.fixture
 def setup_notifications(setup_users):
@@ -274,7 +412,7 @@ def setup_notifications(setup_users):
     
     # General notifications for all users
     for i in range(1, 4):
-        notification = NotificationModel(
+        notification = dict(
             title=f"General Notification {i}",
             message=f"This is a general notification {i} for all users",
             destination_url=f"https://example.com/notifications/{i}",
@@ -287,7 +425,7 @@ def setup_notifications(setup_users):
     
     # User-specific notifications
     for i, user in enumerate(setup_users[:2]):  # Only for first 2 users
-        notification = NotificationModel(
+        notification = dict(
             title=f"User Notification for {user.username}",
             message=f"This is a personal notification for {user.username}",
             destination_url=f"https://example.com/users/{user.id}/notifications",
@@ -299,10 +437,7 @@ def setup_notifications(setup_users):
         )
         notifications.append(notification)
     
-    db.session.add_all(notifications)
-    db.session.commit()
-    
-    return notifications
+    return bulk_create(NotificationModel, notifications)
 
 def auth_header(token):
     """Helper function to create authorization header with JWT token."""
@@ -311,7 +446,7 @@ def auth_header(token):
 def assert_successful_response(response, message=None):
     """Helper function to assert that a response is successful."""
     assert response.status_code == 200
-    data = json.loads(response.data)
+    data = response.get_json()
     assert data['success'] is True
     if message:
         assert message in data.get('message', '')
@@ -320,7 +455,7 @@ def assert_successful_response(response, message=None):
 def assert_error_response(response, status_code, message=None):
     """Helper function to assert that a response is an error."""
     assert response.status_code == status_code
-    data = json.loads(response.data)
+    data = response.get_json()
     assert data['success'] is False
     if message:
         assert message in data.get('error', '') or message in data.get('message', '')
@@ -0,0 +1,24 @@
+import pytest
+from tests.conftest import assert_successful_response, assert_error_response
+
+@pytest.mark.parametrize('field, value', [
+    ('email', 'content@gambitadmin.com'),
+    ('username', 'contentadmin'),
+])
+def test_create_admin_duplicate(client, auth_headers, setup_admins, field, value):
+    """Test that a unique constraint violation names the duplicated field."""
+    payload = {
+        'username': 'newadmin',
+        'email': 'new@gambitadmin.com',
+        'name': 'New Admin',
+        'password': 'newadmin123',
+        field: value,
+    }
+    response = client.post('/api/admins/', json=payload, headers=auth_headers['super_admin'])
+    assert_error_response(response, 400, f"Admin with {field} '{value}' already exists")
+    
+    # The failed insert is rolled back and the session stays usable
+    response = client.post('/api/admins/', json={**payload, field: f'other-{value}'},
+                           headers=auth_headers['super_admin'])
+    data = assert_successful_response(response)
+    assert data['data'][field] == f'other-{value}'
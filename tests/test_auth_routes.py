@@ -1,13 +1,12 @@
-import json
 import pytest
-from tests.conftest import auth_header, assert_successful_response, assert_error_response
-from models import AdminModel
+from tests.conftest import assert_successful_response, assert_error_response
+from models import AdminModel, db
 
 def test_auth_test_route(client):
     """Test the auth test route."""
     response = client.get('/api/auth/test')
-    assert_successful_response(response)
-    assert json.loads(response.data)['data']['message'] == "Auth API is working"
+    data = assert_successful_response(response)
+    assert data['data']['message'] == "Auth API is working"
 
 def test_login_success(client, setup_admins):
     """Test successful login with valid credentials."""
@@ -20,6 +19,14 @@ def test_login_success(client, setup_admins):
     assert 'admin' in data['data']
     assert data['data']['admin']['username'] == 'superadmin'
 
+def test_login_last_login_debounced(client, setup_admins):
+    """Test that repeated logins within the resolution window keep the first last_login."""
+    credentials = {'username': 'superadmin', 'password': 'superadmin123'}
+    first = assert_successful_response(client.post('/api/auth/login', json=credentials))
+    second = assert_successful_response(client.post('/api/auth/login', json=credentials))
+    assert first['data']['admin']['last_login'] is not None
+    assert second['data']['admin']['last_login'] == first['data']['admin']['last_login']
+
 def test_login_invalid_credentials(client, setup_admins):
     """Test login with invalid credentials."""
     # Invalid password
@@ -62,31 +69,71 @@ def test_login_missing_fields(client):
     response = client.post('/api/auth/login', json={})
     assert_error_response(response, 400, "Missing username or password")
 
-def test_get_current_user(client, auth_tokens, setup_admins):
+def test_get_current_user(client, auth_headers, setup_admins):
     """Test getting current user profile."""
     # Successful request
-    response = client.get('/api/auth/me', headers=auth_header(auth_tokens['super_admin']))
+    response = client.get('/api/auth/me', headers=auth_headers['super_admin'])
     data = assert_successful_response(response)
     assert data['data']['username'] == 'superadmin'
     
     # Test with content admin
-    response = client.get('/api/auth/me', headers=auth_header(auth_tokens['content_admin']))
+    response = client.get('/api/auth/me', headers=auth_headers['content_admin'])
     data = assert_successful_response(response)
     assert data['data']['username'] == 'contentadmin'
 
+def test_get_current_user_query_budget(client, auth_headers, setup_admins, query_counter):
+    """Test that the profile is loaded with the admin and role queries only."""
+    headers = auth_headers['super_admin']
+    db.session.expunge_all()
+    query_counter.clear()
+    response = client.get('/api/auth/me', headers=headers)
+    assert_successful_response(response)
+    # One query for the admin, one selectin load for its roles
+    assert len(query_counter) == 2
+    assert 'FROM admins' in query_counter[0]
+    assert 'JOIN roles' in query_counter[1]
+
+def test_get_current_user_etag(client, auth_headers, setup_admins):
+    """Test conditional requests for the current user profile."""
+    headers = auth_headers['super_admin']
+    response = client.get('/api/auth/me', headers=headers)
+    assert_successful_response(response)
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    
+    # Unchanged profile is revalidated without a body
+    response = client.get('/api/auth/me', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    
+    # A stale validator gets the full profile again
+    response = client.get('/api/auth/me', headers={**headers, 'If-None-Match': 'W/"stale"'})
+    data = assert_successful_response(response)
+    assert data['data']['username'] == 'superadmin'
+    
+    # Updating the profile bumps updated_at, so the old validator no longer matches
+    admin_id = setup_admins['super_admin'].id
+    response = client.put(f'/api/admins/{admin_id}', json={'name': 'Renamed Admin'}, headers=headers)
+    assert_successful_response(response)
+    response = client.get('/api/auth/me', headers={**headers, 'If-None-Match': etag})
+    data = assert_successful_response(response)
+    assert data['data']['name'] == 'Renamed Admin'
+    assert response.headers['ETag'] != etag
+
 def test_get_current_user_no_auth(client):
     """Test getting current user without authentication."""
     response = client.get('/api/auth/me')
     assert response.status_code in (401, 422)  # 401 Unauthorized or 422 Unprocessable Entity (missing token)
 
-def test_change_password(client, auth_tokens, setup_admins):
+def test_change_password(client, auth_headers, setup_admins):
     """Test changing password."""
     # Successful password change
     response = client.post('/api/auth/change-password', json={
         'current_password': 'superadmin123',
         'new_password': 'newpassword123'
-    }, headers=auth_header(auth_tokens['super_admin']))
-    assert_successful_response(response, "Password changed successfully")
+    }, headers=auth_headers['super_admin'])
+    data = assert_successful_response(response)
+    assert data['data']['message'] == "Password changed successfully"
     
     # Verify old password no longer works
     admin = AdminModel.query.get(setup_admins['super_admin'].id)
@@ -95,39 +142,39 @@ def test_change_password(client, auth_tokens, setup_admins):
     # Verify new password works
     assert admin.check_password('newpassword123')
 
-def test_change_password_invalid_current(client, auth_tokens):
+def test_change_password_invalid_current(client, auth_headers):
     """Test changing password with invalid current password."""
     response = client.post('/api/auth/change-password', json={
         'current_password': 'wrongpassword',
         'new_password': 'newpassword123'
-    }, headers=auth_header(auth_tokens['super_admin']))
+    }, headers=auth_headers['super_admin'])
     assert_error_response(response, 400, "Current password is incorrect")
 
-def test_change_password_missing_fields(client, auth_tokens):
+def test_change_password_missing_fields(client, auth_headers):
     """Test changing password with missing fields."""
     # Missing current password
     response = client.post('/api/auth/change-password', json={
         'new_password': 'newpassword123'
-    }, headers=auth_header(auth_tokens['super_admin']))
+    }, headers=auth_headers['super_admin'])
     assert_error_response(response, 400, "Missing")
     
     # Missing new password
     response = client.post('/api/auth/change-password', json={
         'current_password': 'superadmin123'
-    }, headers=auth_header(auth_tokens['super_admin']))
+    }, headers=auth_headers['super_admin'])
     assert_error_response(response, 400, "Missing")
     
     # Empty request
-    response = client.post('/api/auth/change-password', json={}, headers=auth_header(auth_tokens['super_admin']))
+    response = client.post('/api/auth/change-password', json={}, headers=auth_headers['super_admin'])
     assert_error_response(response, 400, "Missing")
 
-def test_test_jwt(client, auth_tokens):
+def test_test_jwt(client, auth_headers):
     """Test the JWT test endpoint."""
-    response = client.get('/api/auth/test-jwt', headers=auth_header(auth_tokens['super_admin']))
+    response = client.get('/api/auth/test-jwt', headers=auth_headers['super_admin'])
     data = assert_successful_response(response)
     assert data['data']['message'] == "JWT verification successful"
     
     # Test with no token
     response = client.get('/api/auth/test-jwt')
-    data = json.loads(response.data)
+    data = response.get_json()
     assert "No valid Bearer token found" in data['data']['message']
\ No newline at end of file
@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+from utils.cache import TTLCache
+
+class FakeTimer:
+    """Manually advanced clock for TTLCache."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+def test_get_and_set(timer):
+    """Test basic storage and lookups."""
+    cache = TTLCache(maxsize=4, ttl=10, timer=timer)
+    cache['a'] = 1
+    assert cache.get('a') == 1
+    assert cache['a'] == 1
+    assert 'a' in cache
+    assert cache.get('missing') is None
+    assert cache.get('missing', 'default') == 'default'
+    with pytest.raises(KeyError):
+        cache['missing']
+
+def test_entries_expire_after_ttl(timer):
+    """Test that entries disappear once their ttl has elapsed."""
+    cache = TTLCache(maxsize=4, ttl=10, timer=timer)
+    cache['a'] = 1
+    timer.now = 9.9
+    assert cache.get('a') == 1
+    timer.now = 10
+    assert cache.get('a') is None
+    assert 'a' not in cache
+    assert len(cache) == 0
+
+def test_set_refreshes_expiry(timer):
+    """Test that overwriting a key restarts its ttl."""
+    cache = TTLCache(maxsize=4, ttl=10, timer=timer)
+    cache['a'] = 1
+    timer.now = 8
+    cache['a'] = 2
+    timer.now = 15
+    assert cache.get('a') == 2
+
+def test_evicts_oldest_at_maxsize(timer):
+    """Test that the oldest entry is dropped when maxsize is exceeded."""
+    cache = TTLCache(maxsize=3, ttl=10, timer=timer)
+    for key in 'abc':
+        cache[key] = key
+    cache['a'] = 'a2'  # re-inserting moves 'a' to the newest position
+    cache['d'] = 'd'
+    assert len(cache) == 3
+    assert 'b' not in cache
+    assert [cache.get(key) for key in 'acd'] == ['a2', 'c', 'd']
+
+def test_pop(timer):
+    """Test that pop removes entries and ignores expired ones."""
+    cache = TTLCache(maxsize=4, ttl=10, timer=timer)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache.pop('a') == 1
+    assert 'a' not in cache
+    assert cache.pop('a', 'default') == 'default'
+    timer.now = 10
+    assert cache.pop('b') is None
+    assert len(cache) == 0
+
+def test_clear(timer):
+    """Test that clear removes every entry."""
+    cache = TTLCache(maxsize=4, ttl=10, timer=timer)
+    cache['a'] = 1
+    cache['b'] = 2
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get('a') is None
+    cache['a'] = 3
+    assert cache.get('a') == 3
+
+def test_concurrent_writes_respect_maxsize():
+    """Test that writers on several threads never push the cache past maxsize."""
+    cache = TTLCache(maxsize=50, ttl=60)
+    errors = []
+
+    def writer(thread_id):
+        try:
+            for i in range(1000):
+                cache[(thread_id, i)] = i
+                cache.get((thread_id, i - 1))
+        except Exception as e:  # surfaced in the main thread below
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(cache) == 50
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from utils.db_errors import duplicate_field
+
+def integrity_error(orig):
+    return SimpleNamespace(orig=orig)
+
+class FakePsycopgError(Exception):
+    def __init__(self, message, constraint_name):
+        super().__init__(message)
+        self.diag = SimpleNamespace(constraint_name=constraint_name)
+
+def test_duplicate_field_from_postgres_constraint_name():
+    """Test that psycopg2's constraint name picks the field."""
+    error = integrity_error(FakePsycopgError(
+        'duplicate key value violates unique constraint "users_username_key"',
+        'users_username_key',
+    ))
+    assert duplicate_field(error, ('email', 'username', 'uuid')) == 'username'
+
+def test_duplicate_field_from_sqlite_message():
+    """Test the fallback to the driver message when there is no diag."""
+    error = integrity_error(Exception('UNIQUE constraint failed: users.email'))
+    assert duplicate_field(error, ('email', 'username', 'uuid')) == 'email'
+
+def test_duplicate_field_unknown_constraint():
+    """Test that violations of other constraints aren't attributed to a field."""
+    error = integrity_error(FakePsycopgError(
+        'insert or update on table "users" violates foreign key constraint',
+        'users_team_id_fkey',
+    ))
+    assert duplicate_field(error, ('email', 'username', 'uuid')) is None
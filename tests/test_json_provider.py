@@ -0,0 +1,70 @@
+import dataclasses
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+# Payloads whose encoded bytes must match Flask's default provider exactly
+SAME_OUTPUT = {
+    'datetime': {'at': datetime(2024, 1, 2, 3, 4, 5, 678)},
+    'aware_datetime': {'at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)},
+    'date': {'on': date(2024, 1, 2)},
+    'uuid': {'id': uuid.UUID('12345678-1234-5678-1234-567812345678')},
+    'decimal': {'amount': Decimal('1.50')},
+    'int_keys': {2: 'b', 10: 'c', 1: 'a'},
+    'nested_int_keys': {'counts': {2024: 3, 999: 1}},
+    'sorted_keys': {'b': [1, 2, {'z': 1, 'a': 2}], 'a': None, 'c': 1.5, 'd': True},
+    'dataclass': Point(1, 2),
+    'big_int': {'n': 2 ** 70},
+    'list': [{'b': 1, 'a': 2}, 'text', 3],
+}
+
+@pytest.fixture
+def default_provider(app_session):
+    """Flask's stock provider, for comparison with the app's provider."""
+    with app_session.test_request_context():
+        yield DefaultJSONProvider(app_session)
+
+@pytest.fixture
+def debug_mode(app_session):
+    """Pretty-print responses the way Flask does in debug mode."""
+    app_session.debug = True
+    yield
+    app_session.debug = False
+
+@pytest.mark.parametrize('payload', SAME_OUTPUT.values(), ids=SAME_OUTPUT.keys())
+def test_jsonify_matches_default_provider(default_provider, payload):
+    """Test that jsonify output is byte-for-byte the same as Flask's default."""
+    assert jsonify(payload).get_data() == default_provider.response(payload).get_data()
+
+@pytest.mark.parametrize('payload', SAME_OUTPUT.values(), ids=SAME_OUTPUT.keys())
+def test_jsonify_matches_default_provider_pretty(default_provider, debug_mode, payload):
+    """Test that indented debug output is the same as Flask's default."""
+    assert jsonify(payload).get_data() == default_provider.response(payload).get_data()
+
+def test_non_ascii_written_as_utf8(default_provider):
+    """Test that non-ASCII text is sent as UTF-8 and decodes to the same data."""
+    payload = {'name': 'José Müller'}
+    data = jsonify(payload).get_data()
+    assert 'José'.encode() in data
+    assert json.loads(data) == json.loads(default_provider.response(payload).get_data())
+
+def test_loads_matches_default_provider(app_session, default_provider):
+    """Test that decoding gives the same result as the stdlib."""
+    text = '{"a": [1, 2.5, null, true], "b": {"c": "\\u00e9"}}'
+    assert app_session.json.loads(text) == default_provider.loads(text)
+    assert app_session.json.loads(text.encode()) == default_provider.loads(text.encode())
+
+def test_unserializable_raises_type_error(default_provider):
+    """Test that unsupported types fail the same way as with the stdlib."""
+    with pytest.raises(TypeError):
+        jsonify({'s': {1, 2}})
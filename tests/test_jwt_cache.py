@@ -0,0 +1,114 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from flask_jwt_extended import JWTManager, create_access_token, decode_token
+from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError, DecodeError
+
+import utils.jwt_cache
+
+@pytest.fixture
+def jwt_manager(app_session):
+    """The app's CachingJWTManager with an empty claims cache."""
+    manager = app_session.extensions['flask-jwt-extended']
+    manager._claims_cache.clear()
+    with app_session.app_context():
+        yield manager
+    manager._claims_cache.clear()
+
+@pytest.fixture
+def full_decodes(monkeypatch):
+    """Count the decodes that go through flask-jwt-extended's own verification."""
+    calls = []
+    original = JWTManager._decode_jwt_from_config
+
+    def counting_decode(self, *args, **kwargs):
+        calls.append(args)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(JWTManager, '_decode_jwt_from_config', counting_decode)
+    return calls
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Control the time the cache checks exp and nbf against (PyJWT keeps the real clock)."""
+    clock = SimpleNamespace(now=time.time())
+    monkeypatch.setattr(utils.jwt_cache, 'time', SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+def test_decode_uses_cache(jwt_manager, full_decodes):
+    """Test that a verified token is decoded from the cache on later requests."""
+    token = create_access_token(identity='1')
+    first = decode_token(token)
+    second = decode_token(token)
+    assert first == second
+    assert first['sub'] == '1'
+    assert len(full_decodes) == 1
+    assert len(jwt_manager._claims_cache) == 1
+
+    # Callers get their own copy of the cached claims
+    second['sub'] = 'changed'
+    assert decode_token(token)['sub'] == '1'
+
+def test_expired_token_rejected_after_caching(jwt_manager):
+    """Test that a cached token stops decoding once its exp has passed."""
+    token = create_access_token(identity='1', expires_delta=timedelta(seconds=1))
+    claims = decode_token(token)
+    assert len(jwt_manager._claims_cache) == 1
+
+    # The cache TTL is far longer than the token's lifetime
+    time.sleep(max(claims['exp'] - time.time(), 0) + 0.05)
+    with pytest.raises(ExpiredSignatureError):
+        decode_token(token)
+
+def test_invalid_token_not_cached(jwt_manager, full_decodes):
+    """Test that tokens failing verification are never cached."""
+    token = create_access_token(identity='1')
+    header, payload, signature = token.split('.')
+    tampered = f"{header}.{payload}.{'B' if signature[0] == 'A' else 'A'}{signature[1:]}"
+
+    # Repeated attempts with the same bad token are verified every time
+    for _ in range(2):
+        with pytest.raises(InvalidSignatureError):
+            decode_token(tampered)
+    with pytest.raises(DecodeError):
+        decode_token('not-a-jwt')
+
+    assert len(full_decodes) == 3
+    assert len(jwt_manager._claims_cache) == 0
+
+def test_cached_exp_uses_leeway(app_session, jwt_manager, full_decodes, clock, monkeypatch):
+    """Test that a cache hit honours JWT_DECODE_LEEWAY for exp like a full decode."""
+    monkeypatch.setitem(app_session.config, 'JWT_DECODE_LEEWAY', 5)
+    token = create_access_token(identity='1')
+    exp = decode_token(token)['exp']
+
+    # Past exp but inside the leeway: still served from the cache
+    clock.now = exp + 4
+    decode_token(token)
+    assert len(full_decodes) == 1
+
+    # Beyond the leeway: the cache is bypassed and the token is verified again
+    clock.now = exp + 5
+    decode_token(token)
+    assert len(full_decodes) == 2
+
+def test_cached_nbf_is_checked(app_session, jwt_manager, full_decodes, clock, monkeypatch):
+    """Test that a cache hit rejects claims whose nbf is still in the future."""
+    token = create_access_token(identity='1')
+    nbf = decode_token(token)['nbf']
+
+    clock.now = nbf
+    decode_token(token)
+    assert len(full_decodes) == 1
+
+    # Before nbf the cached claims are not reused
+    clock.now = nbf - 1
+    decode_token(token)
+    assert len(full_decodes) == 2
+
+    # ...unless the leeway covers the gap
+    monkeypatch.setitem(app_session.config, 'JWT_DECODE_LEEWAY', timedelta(seconds=2))
+    decode_token(token)
+    assert len(full_decodes) == 2
@@ -0,0 +1,79 @@
+from utils.records import IdIndex, IdSequence
+
+def test_id_sequence_starts_after_largest_id():
+    """Test that new ids continue from the largest existing id."""
+    records = [{'id': 3}, {'id': 7}, {'id': 5}]
+    ids = IdSequence(records)
+    assert ids.next_id() == 8
+    assert ids.next_id() == 9
+
+def test_id_sequence_empty_list():
+    """Test that an empty list starts at 1."""
+    assert IdSequence([]).next_id() == 1
+
+def test_id_sequence_stays_monotonic_after_deletes():
+    """Test that deleting records never causes an id to be handed out twice."""
+    records = [{'id': 1}, {'id': 2}]
+    ids = IdSequence(records)
+    issued = []
+    for _ in range(3):
+        new_id = ids.next_id()
+        records.append({'id': new_id})
+        issued.append(new_id)
+
+    # Drop the newest records, including the current maximum
+    del records[-2:]
+    issued.append(ids.next_id())
+
+    assert issued == [3, 4, 5, 6]
+    assert issued == sorted(set(issued))
+
+def test_id_index_lookup():
+    """Test looking records up by id."""
+    records = [{'id': 10, 'name': 'a'}, {'id': 20, 'name': 'b'}]
+    index = IdIndex(records)
+    assert index.index_of(20) == 1
+    assert index.get(10)['name'] == 'a'
+    assert index.index_of(30) is None
+    assert index.get(30) is None
+
+def test_id_index_sees_appends():
+    """Test that records appended to the list are found."""
+    records = [{'id': 1}]
+    index = IdIndex(records)
+    assert index.get(2) is None
+    records.append({'id': 2})
+    assert index.index_of(2) == 1
+
+def test_id_index_after_update_in_place():
+    """Test that replacing a record at its position returns the new record."""
+    records = [{'id': 1, 'name': 'old'}, {'id': 2, 'name': 'other'}]
+    index = IdIndex(records)
+    assert index.get(1)['name'] == 'old'
+    records[0] = {'id': 1, 'name': 'new'}
+    assert index.get(1)['name'] == 'new'
+    records[1]['name'] = 'changed'
+    assert index.get(2)['name'] == 'changed'
+
+def test_id_index_after_remove():
+    """Test that removing a record shifts the positions of the rest."""
+    records = [{'id': 1}, {'id': 2}, {'id': 3}]
+    index = IdIndex(records)
+    assert index.index_of(3) == 2
+
+    records.pop(0)
+    assert index.get(1) is None
+    assert index.index_of(2) == 0
+    assert index.index_of(3) == 1
+
+def test_id_index_after_remove_and_insert():
+    """Test consistency when a remove and an insert leave the length unchanged."""
+    records = [{'id': 1}, {'id': 2}, {'id': 3}]
+    index = IdIndex(records)
+    assert index.index_of(3) == 2
+
+    records.pop(0)
+    records.append({'id': 4})
+    assert index.index_of(4) == 2
+    assert index.index_of(3) == 1
+    assert index.get(2) == {'id': 2}
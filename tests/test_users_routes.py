@@ -0,0 +1,111 @@
+import pytest
+from tests.conftest import assert_successful_response, assert_error_response
+from models import UserModel, db
+
+def get_users_page(client, headers, **params):
+    """Fetch one page of the user list and return its data."""
+    response = client.get('/api/users/', query_string=params, headers=headers)
+    return assert_successful_response(response)['data']
+
+def test_get_users_first_page(client, auth_headers, setup_users):
+    """Test that the first page holds the lowest ids and a cursor to the next page."""
+    ids = sorted(user.id for user in setup_users)
+    page = get_users_page(client, auth_headers['user_admin'], limit=2)
+    assert [user['id'] for user in page['users']] == ids[:2]
+    assert page['next_cursor'] == ids[1]
+
+def test_get_users_follow_cursor(client, auth_headers, setup_users):
+    """Test that following next_cursor walks every user exactly once."""
+    ids = sorted(user.id for user in setup_users)
+    seen, pages, cursor = [], 0, None
+    while True:
+        params = {'limit': 2} if cursor is None else {'limit': 2, 'after_id': cursor}
+        page = get_users_page(client, auth_headers['user_admin'], **params)
+        seen.extend(user['id'] for user in page['users'])
+        pages += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == ids
+    assert pages == 3
+
+def test_get_users_last_page(client, auth_headers, setup_users):
+    """Test that a page that ends exactly at the last user has no cursor."""
+    ids = sorted(user.id for user in setup_users)
+    page = get_users_page(client, auth_headers['user_admin'], limit=len(ids))
+    assert [user['id'] for user in page['users']] == ids
+    assert page['next_cursor'] is None
+    
+    page = get_users_page(client, auth_headers['user_admin'], after_id=ids[-1])
+    assert page == {'users': [], 'next_cursor': None}
+
+def test_get_users_status_filter_with_cursor(client, auth_headers, setup_users):
+    """Test that the status filter applies across pages."""
+    active = sorted(user.id for user in setup_users if user.status == 'active')
+    page = get_users_page(client, auth_headers['user_admin'], status='active', limit=1)
+    assert [user['id'] for user in page['users']] == active[:1]
+    page = get_users_page(client, auth_headers['user_admin'], status='active', after_id=page['next_cursor'])
+    assert [user['id'] for user in page['users']] == active[1:]
+    assert page['next_cursor'] is None
+
+@pytest.mark.parametrize('limit, expected_count', [
+    ('abc', 5),   # not an integer: the default page size applies
+    ('0', 1),     # clamped up to one user
+    ('-3', 1),
+    ('1000', 5),  # clamped down to the maximum, which still fits everyone
+])
+def test_get_users_bad_limit(client, auth_headers, setup_users, limit, expected_count):
+    """Test that invalid page sizes are clamped or replaced instead of failing."""
+    page = get_users_page(client, auth_headers['user_admin'], limit=limit)
+    assert len(page['users']) == expected_count
+
+def test_get_users_limit_capped(client, auth_headers, setup_users, monkeypatch):
+    """Test that limit never exceeds MAX_PAGE_SIZE."""
+    monkeypatch.setattr('routes.users.MAX_PAGE_SIZE', 2)
+    page = get_users_page(client, auth_headers['user_admin'], limit=1000)
+    assert len(page['users']) == 2
+    assert page['next_cursor'] is not None
+
+def test_delete_user(client, auth_headers, setup_users):
+    """Test that deleting a user returns only its id by default."""
+    user = setup_users[0]
+    response = client.delete(f'/api/users/{user.id}', headers=auth_headers['user_admin'])
+    data = assert_successful_response(response)
+    assert data['data'] == {'message': 'User deleted successfully', 'id': user.id}
+    assert db.session.get(UserModel, user.id) is None
+
+def test_delete_user_full(client, auth_headers, setup_users):
+    """Test that ?full=1 returns the deleted user record."""
+    user = setup_users[1]
+    expected = user.to_dict()
+    response = client.delete(f'/api/users/{user.id}?full=1', headers=auth_headers['user_admin'])
+    data = assert_successful_response(response)
+    assert data['data']['message'] == 'User deleted successfully'
+    assert data['data']['id'] == user.id
+    assert data['data']['user'] == expected
+
+def test_delete_user_not_found(client, auth_headers, setup_users):
+    """Test deleting a user that doesn't exist."""
+    response = client.delete('/api/users/999999', headers=auth_headers['user_admin'])
+    assert_error_response(response, 404, "User not found")
+
+@pytest.mark.parametrize('field, value', [
+    ('email', 'user1@example.com'),
+    ('username', 'user1'),
+])
+def test_create_user_duplicate(client, auth_headers, setup_users, field, value):
+    """Test that a unique constraint violation names the duplicated field."""
+    payload = {
+        'email': 'new@example.com',
+        'username': 'newuser',
+        'full_name': 'New User',
+        'status': 'active',
+        field: value,
+    }
+    response = client.post('/api/users/', json=payload, headers=auth_headers['user_admin'])
+    assert_error_response(response, 400, f"User with {field} '{value}' already exists")
+    
+    # The failed insert is rolled back and the session stays usable
+    response = client.post('/api/users/', json={**payload, field: f'other-{value}'},
+                           headers=auth_headers['user_admin'])
+    assert response.status_code == 201
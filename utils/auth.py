@@ -9,10 +9,34 @@ from functools import wraps
 from flask import jsonify, g, request, redirect, url_for
 from flask_jwt_extended import create_access_token, verify_jwt_in_request, get_jwt_identity, jwt_required
 
-from models import AdminModel, PermissionType
+from models import AdminModel, PermissionType, db
+from utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Short-lived cache of (is_active, permissions) per admin so permission
+# checks skip the admin and role queries. Admin and role writes invalidate it.
+_admin_access_cache = TTLCache(maxsize=4096, ttl=30)
+
+def _get_admin_access(admin_id):
+    """Return (is_active, permissions) for an admin, or None if it doesn't exist"""
+    access = _admin_access_cache.get(admin_id)
+    if access is None:
+        admin = db.session.get(AdminModel, admin_id)
+        if not admin:
+            return None
+        permissions = frozenset(permission for role in admin.roles for permission in role.permissions or [])
+        access = (admin.is_active, permissions)
+        _admin_access_cache[admin_id] = access
+    return access
+
+def invalidate_admin_access(admin_id=None):
+    """Drop cached permissions for one admin, or for all admins if no ID is given"""
+    if admin_id is None:
+        _admin_access_cache.clear()
+    else:
+        _admin_access_cache.pop(admin_id)
+
 def create_auth_token(admin_id):
     """Create a JWT token for an admin user"""
     # Convert the admin_id to a string to avoid JWT subject validation error
@@ -34,24 +58,25 @@ def require_permission(permission):
             if isinstance(admin_id, str):
                 admin_id = int(admin_id)
                 
-            # Get admin from database
-            admin = AdminModel.query.get(admin_id)
+            # Get admin status and permissions (cached briefly)
+            access = _get_admin_access(admin_id)
             
-            if not admin:
+            if not access:
                 return jsonify({"success": False, "message": "Invalid admin account"}), 401
             
-            if not admin.is_active:
+            is_active, permissions = access
+            if not is_active:
                 return jsonify({"success": False, "message": "Account is deactivated"}), 403
             
-            # Store admin for potential use in the view function
-            g.admin = admin
+            # Store admin ID for potential use in the view function
+            g.admin_id = admin_id
             
             # If super admin or has the 'all' permission, allow access
-            if admin.has_permission(PermissionType.ALL):
+            if PermissionType.ALL in permissions:
                 return fn(*args, **kwargs)
             
             # Check specific permission
-            if not admin.has_permission(permission):
+            if permission not in permissions:
                 return jsonify({
                     "success": False, 
                     "message": f"You don't have the required permission: {permission}"
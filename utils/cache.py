@@ -0,0 +1,69 @@
+"""
+Caching utilities for the Gambit Admin API.
+Provides a small thread-safe in-memory TTL cache for hot request paths.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """Bounded in-memory mapping whose entries expire after ``ttl`` seconds.
+
+    Entries are evicted oldest-first once ``maxsize`` is reached. Values live
+    only in process memory and are never persisted.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value = item
+            if expires_at <= self._timer():
+                del self._data[key]
+                return default
+            return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (self._timer() + self.ttl, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def pop(self, key, default=None):
+        """Remove key and return its value, or default if missing or expired"""
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        if item is _MISSING or item[0] <= self._timer():
+            return default
+        return item[1]
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
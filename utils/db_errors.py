@@ -0,0 +1,17 @@
+"""
+Database error helpers for the Gambit Admin API.
+Translates constraint violations into the field that caused them.
+"""
+
+def duplicate_field(error, fields):
+    """Return which of fields an IntegrityError's unique violation refers to, or None
+
+    Uses the constraint name reported by psycopg2 (e.g. ``admins_email_key``)
+    and falls back to the driver's message for other backends such as SQLite.
+    """
+    diag = getattr(error.orig, 'diag', None)
+    source = getattr(diag, 'constraint_name', None) or str(error.orig)
+    for field in fields:
+        if field in source:
+            return field
+    return None
@@ -0,0 +1,47 @@
+"""
+JSON provider for the Gambit Admin API.
+Encodes and decodes JSON with orjson when it is installed.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder used by Flask
+    orjson = None
+
+_COMPACT_SEPARATORS = (",", ":")
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Output matches Flask's default provider (sorted keys, compact or
+    two-space indented, dates as HTTP dates), except that non-ASCII text is
+    written as UTF-8 instead of ``\\u`` escapes. Anything orjson cannot
+    express the same way, such as dicts with non-str keys, is handed back to
+    the stdlib implementation.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+
+        # Dates go through Flask's default() so they keep the HTTP date format
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        for key, value in kwargs.items():
+            if key == "indent" and value == 2:
+                option |= orjson.OPT_INDENT_2
+            elif not (key == "separators" and tuple(value) == _COMPACT_SEPARATORS):
+                return super().dumps(obj, **kwargs)
+
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
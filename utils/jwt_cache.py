@@ -0,0 +1,52 @@
+"""
+JWT utilities for the Gambit Admin API.
+Caches verified token claims so repeat requests skip signature verification.
+"""
+
+import hashlib
+import time
+from datetime import timedelta
+
+from flask import current_app
+from flask_jwt_extended import JWTManager
+
+from utils.cache import TTLCache
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that remembers the claims of recently verified tokens.
+
+    Only tokens that passed full verification are cached, keyed by a digest
+    of the raw token. A cached token is only reused while its ``exp`` and
+    ``nbf`` claims still pass the same checks, with the same
+    ``JWT_DECODE_LEEWAY``, that PyJWT applies; otherwise it is decoded in
+    full again, which raises the usual error. Blocklist checks run on every
+    request as before.
+    """
+
+    def __init__(self, app=None, add_context_processor=False, maxsize=10000, ttl=300):
+        self._claims_cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        super().__init__(app, add_context_processor)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # Expired-token and CSRF-bound decodes always take the full path
+        if allow_expired or csrf_value is not None:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.blake2b(encoded_token.encode(), digest_size=16).digest()
+        claims = self._claims_cache.get(key)
+        if claims is None or not _time_claims_valid(claims):
+            claims = super()._decode_jwt_from_config(encoded_token)
+            self._claims_cache[key] = claims
+        return dict(claims)
+
+def _time_claims_valid(claims):
+    """Apply PyJWT's exp and nbf checks, with the configured leeway, to cached claims"""
+    leeway = current_app.config["JWT_DECODE_LEEWAY"]
+    if isinstance(leeway, timedelta):
+        leeway = leeway.total_seconds()
+    now = time.time()
+    if "exp" in claims and claims["exp"] <= now - leeway:
+        return False
+    if "nbf" in claims and claims["nbf"] > now + leeway:
+        return False
+    return True
@@ -11,6 +11,16 @@ from models import (
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Value pools for randomly generated records
+USER_STATUSES = ("active", "inactive", "suspended")
+SUBSCRIPTION_TYPES = ("monthly", "yearly")
+SUBSCRIPTION_STATUSES = ("active", "expired", "cancelled")
+# How many days back a generated registration or subscription may start
+START_AGE_DAYS = range(1, 501)
+
+TOTAL_USERS = 2500
+TOTAL_SUBSCRIBERS = 10000
+
 def initialize_mock_data():
     """Generate mock data for all models"""
     logger.info("Initializing mock data...")
@@ -209,12 +219,18 @@ def generate_users():
     first_names = ["Theresa", "Savannah", "Darlene", "Jackson", "Michelle", "Kenzi", "Robert", "James", "Emma", "Olivia"]
     last_names = ["Webb", "Nguyen", "Robertson", "Graham", "Rivera", "Lawson", "Smith", "Johnson", "Williams", "Brown"]
     
+    now = datetime.now()
+    
+    # Draw the per-user random fields in bulk instead of once per loop iteration
+    statuses = random.choices(USER_STATUSES, k=TOTAL_USERS)
+    registration_ages = random.choices(START_AGE_DAYS, k=TOTAL_USERS)
+    
     # Generate ~40 named users first with more detailed data
     named_users = []
     for i in range(1, 41):
-        status = random.choice(["active", "inactive", "suspended"])
-        registration_date = datetime.now() - timedelta(days=random.randint(1, 500))
-        last_login = registration_date + timedelta(days=random.randint(0, (datetime.now() - registration_date).days))
+        status = statuses[i - 1]
+        registration_date = now - timedelta(days=registration_ages[i - 1])
+        last_login = registration_date + timedelta(days=random.randint(0, (now - registration_date).days))
         
         first_name = random.choice(first_names)
         last_name = random.choice(last_names)
@@ -235,10 +251,10 @@ def generate_users():
         named_users.append(user)
     
     # Then generate the rest up to 2500 total
-    for i in range(41, 2501):
-        status = random.choice(["active", "inactive", "suspended"])
-        registration_date = datetime.now() - timedelta(days=random.randint(1, 500))
-        last_login = registration_date + timedelta(days=random.randint(0, (datetime.now() - registration_date).days))
+    for i in range(41, TOTAL_USERS + 1):
+        status = statuses[i - 1]
+        registration_date = now - timedelta(days=registration_ages[i - 1])
+        last_login = registration_date + timedelta(days=random.randint(0, (now - registration_date).days))
         
         user = User.create_record(
             id=i,
@@ -257,11 +273,18 @@ def generate_users():
 
 def generate_subscribers():
     """Generate mock subscriber data"""
+    now = datetime.now()
+    
+    # Draw the per-subscriber random fields in bulk
+    subscription_types = random.choices(SUBSCRIPTION_TYPES, k=TOTAL_SUBSCRIBERS)
+    statuses = random.choices(SUBSCRIPTION_STATUSES, k=TOTAL_SUBSCRIBERS)
+    start_ages = random.choices(START_AGE_DAYS, k=TOTAL_SUBSCRIBERS)
+    
     # Generate ~10000 subscribers
-    for i in range(1, 10001):
-        subscription_type = random.choice(["monthly", "yearly"])
-        status = random.choice(["active", "expired", "cancelled"])
-        start_date = datetime.now() - timedelta(days=random.randint(1, 500))
+    for i in range(1, TOTAL_SUBSCRIBERS + 1):
+        subscription_type = subscription_types[i - 1]
+        status = statuses[i - 1]
+        start_date = now - timedelta(days=start_ages[i - 1])
         
         # End date logic depends on subscription type and status
         if subscription_type == "monthly":
@@ -0,0 +1,67 @@
+"""
+In-memory record helpers for the Gambit Admin API.
+Support the mock data lists that back the non-database endpoints.
+"""
+
+import itertools
+import threading
+
+class IdSequence:
+    """Hands out increasing ids for a list of dict records.
+
+    The starting point is taken from the largest ``id`` in the list the first
+    time an id is requested; later ids come from a counter instead of
+    rescanning the list.
+    """
+
+    def __init__(self, records):
+        self._records = records
+        self._counter = None
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        """Return the next unused id"""
+        with self._lock:
+            if self._counter is None:
+                start = max((r['id'] for r in self._records), default=0) + 1
+                self._counter = itertools.count(start)
+            return next(self._counter)
+
+class IdIndex:
+    """Maps record ids to their position in a list of dict records.
+
+    The mapping is rebuilt lazily whenever the list has changed length, a
+    cached position no longer holds the requested id, or the id is missing
+    from a mapping that may be stale, so inserts and deletes on the list
+    itself keep working without extra bookkeeping. Lookups of unknown ids
+    therefore cost one scan, as they did before the index.
+    """
+
+    def __init__(self, records):
+        self._records = records
+        self._positions = {}
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _rebuild(self):
+        self._positions = {r['id']: i for i, r in enumerate(self._records)}
+        self._size = len(self._records)
+
+    def index_of(self, record_id):
+        """Return the list position of the record with record_id, or None"""
+        with self._lock:
+            rebuilt = self._size != len(self._records)
+            if rebuilt:
+                self._rebuild()
+            i = self._positions.get(record_id)
+            if i is None or i >= len(self._records) or self._records[i]['id'] != record_id:
+                if rebuilt:
+                    return i
+                self._rebuild()
+                i = self._positions.get(record_id)
+            return i
+
+    def get(self, record_id):
+        """Return the record with record_id, or None"""
+        i = self.index_of(record_id)
+        return None if i is None else self._records[i]
@@ -5,7 +5,7 @@ Provides consistent response formatting across all endpoints.
 
 from flask import jsonify
 
-def format_response(data, message=None):
+def format_response(data, message=None, status_code=200):
     """Format a successful API response"""
     response = {
         "success": True,
@@ -15,7 +15,10 @@ def format_response(data, message=None):
     if message:
         response["message"] = message
     
-    return jsonify(response)
+    # Encoded by the app's JSON provider (orjson when installed)
+    result = jsonify(response)
+    result.status_code = status_code
+    return result
 
 def format_error(message, status_code=500, error_code=None):
     """Format an error API response"""